@@ -0,0 +1,112 @@
+# api/event_stream.py
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from config.settings import settings
+from tasks.task_queue import TaskQueue
+from utils.event_bus import EventBus
+
+TERMINAL_EVENTS = ('task_completed', 'task_failed')
+
+class TaskEventBroker:
+    """Fans 'progress' events from the EventBus out to per-task asyncio subscribers.
+
+    Events arrive on executor/scanner threads and are handed to each subscriber's
+    event loop with call_soon_threadsafe. The most recent events of each task are
+    kept so clients that connect late still see the whole run.
+    """
+
+    def __init__(self, event_bus: EventBus, history_size: int = 500, max_tasks: int = 100) -> None:
+        self.lock = threading.Lock()
+        self.history_size = history_size
+        self.max_tasks = max_tasks
+        self.history: 'OrderedDict[str, Deque[Dict[str, Any]]]' = OrderedDict()
+        self.subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        event_bus.subscribe('progress', self.on_event)
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        task_id = event.get('task_id')
+        if task_id is None:
+            return
+        with self.lock:
+            if task_id not in self.history:
+                self.history[task_id] = deque(maxlen=self.history_size)
+                while len(self.history) > self.max_tasks:
+                    self.history.popitem(last=False)
+            self.history[task_id].append(event)
+            subscribers = list(self.subscribers.get(task_id, []))
+        for loop, event_queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(event_queue.put_nowait, event)
+            except RuntimeError:
+                pass  # Subscriber's loop already closed
+
+    async def stream(self, task_id: str, keepalive: float = 15.0) -> AsyncIterator[str]:
+        """Server-sent events for one task: replayed history, then live events until the task ends."""
+        event_queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), event_queue)
+        with self.lock:
+            backlog = list(self.history.get(task_id, []))
+            self.subscribers.setdefault(task_id, []).append(subscriber)
+        try:
+            for event in backlog:
+                yield self.format_event(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(event_queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield self.format_event(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self.lock:
+                subscribers = self.subscribers.get(task_id, [])
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+                if not subscribers:
+                    self.subscribers.pop(task_id, None)
+
+    @staticmethod
+    def format_event(event: Dict[str, Any]) -> str:
+        return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+async def stream_queued_events(task_queue: TaskQueue, task_id: str, poll_interval: Optional[float] = None,
+                               keepalive: float = 15.0) -> AsyncIterator[str]:
+    """Server-sent events for a task run by a worker process, read back from the shared queue."""
+    interval = poll_interval or settings.task_poll_interval
+    after = 0
+    idle = 0.0
+    finished = False
+    while True:
+        events = await run_in_threadpool(task_queue.events_since, task_id, after)
+        for seq, event in events:
+            after = seq
+            yield TaskEventBroker.format_event(event)
+            if event['event'] in TERMINAL_EVENTS:
+                return
+        if finished:
+            # Ended without a terminal event (e.g. given up after repeated interruptions): report the final state
+            task = await run_in_threadpool(task_queue.get_task, task_id, True)
+            if task is not None:
+                yield TaskEventBroker.format_event({'event': f'task_{task.status}', 'task_id': task_id,
+                                                    'status': task.status, 'result': task.result, 'error': task.error})
+            return
+        task = await run_in_threadpool(task_queue.get_task, task_id, True)
+        # Look once more after the task ends: its terminal event is written just after the status
+        finished = task is None or task.status in ('completed', 'failed')
+        if events:
+            idle = 0.0
+        elif not finished:
+            idle += interval
+            if idle >= keepalive:
+                idle = 0.0
+                yield ': keepalive\n\n'
+            await asyncio.sleep(interval)
@@ -1,30 +1,98 @@
-from fastapi import APIRouter, UploadFile, File, Response
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional
 from pathlib import Path
+from config.settings import settings
+import hashlib
+import os
+import uuid
 
 router = APIRouter()
 
+def _file_location(file_name: Optional[str]) -> Optional[Path]:
+    # Only plain names are accepted so requests cannot escape the upload directory; None for unusable names
+    name = Path(file_name or '').name
+    if name in ('', '.', '..'):
+        return None
+    return Path(settings.upload_dir) / name
+
+def _invalid_name() -> JSONResponse:
+    return JSONResponse({"error": "invalid file name"}, status_code=400)
+
+def _etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+def _not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
 @router.post("/upload/")
-async def upload_file(file: UploadFile = File(...)) -> dict:
-    file_location = Path("uploads") / file.filename
-    with file_location.open("wb") as f:
-        content = await file.read()
-        f.write(content)
-    return {"info": f"file '{file.filename}' saved at '{file_location}'"}
+async def upload_file(file: UploadFile = File(...)) -> Response:
+    file_location = _file_location(file.filename)
+    if file_location is None:
+        return _invalid_name()
+    file_location.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per request: concurrent uploads of one name each write their own file, the last rename wins
+    tmp_location = file_location.with_name(f".{file_location.name}.{uuid.uuid4().hex}.part")
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with tmp_location.open("wb") as f:
+            # Bounded memory: one chunk in flight, hashed as it is written
+            while True:
+                chunk = await file.read(settings.upload_chunk_size)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(f.write, chunk)
+        os.replace(tmp_location, file_location)
+    finally:
+        if tmp_location.exists():
+            tmp_location.unlink()
+    return JSONResponse({
+        "info": f"file '{file.filename}' saved at '{file_location}'",
+        "size": size,
+        "sha256": sha256.hexdigest()
+    })
 
 @router.get("/download/{file_name}")
-async def download_file(file_name: str) -> Response:
-    file_location = Path("uploads") / file_name
-    if file_location.exists():
-        return Response(content=file_location.read_bytes(), media_type='application/octet-stream')
-    else:
+async def download_file(file_name: str, request: Request) -> Response:
+    file_location = _file_location(file_name)
+    if file_location is None:
+        return _invalid_name()
+    try:
+        stat_result = file_location.stat()
+    except OSError:
+        return Response(status_code=404)
+    if not file_location.is_file():
         return Response(status_code=404)
+    etag = _etag(stat_result)
+    headers = {'etag': etag, 'last-modified': formatdate(stat_result.st_mtime, usegmt=True)}
+    if _not_modified(request, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+    # FileResponse streams from disk, answers Range/If-Range and uses the server's sendfile path when offered
+    return FileResponse(file_location, media_type='application/octet-stream',
+                        headers=headers, stat_result=stat_result)
 
 @router.delete("/delete/{file_name}")
-async def delete_file(file_name: str) -> dict:
-    file_location = Path("uploads") / file_name
-    if file_location.exists():
+async def delete_file(file_name: str) -> Response:
+    file_location = _file_location(file_name)
+    if file_location is None:
+        return _invalid_name()
+    if file_location.is_file():
         file_location.unlink()
-        return {"info": f"file '{file_name}' deleted"}
+        return JSONResponse({"info": f"file '{file_name}' deleted"})
     else:
-        return {"error": "file not found"}
\ No newline at end of file
+        return JSONResponse({"error": "file not found"})
@@ -1,13 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from config.settings import settings
 from api.file_manager import router as file_router
 from api.task_manager import router as task_router
+from api.release_results import router as release_router
+from core.git_handler import get_git_spawn_count, get_git_output_bytes
+from utils.metrics import metrics
 
 app = FastAPI()
 
 app.include_router(file_router, prefix="/files")
 app.include_router(task_router, prefix="/tasks")
+app.include_router(release_router, prefix="/releases")
+
+@app.get("/metrics")
+def get_metrics() -> Response:
+    # Only this process's registry: runs executed by `tasks.worker` processes (task_execution='workers') are not counted
+    # Git totals live in the git layer; copy them in at scrape time
+    metrics.set('release_git_processes_total', get_git_spawn_count(), 'git processes started', metric_type='counter')
+    metrics.set('release_git_output_bytes_total', get_git_output_bytes(), 'Bytes read from git output', metric_type='counter')
+    return Response(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.api_settings['host'], port=settings.api_settings['port'], debug=settings.api_settings['debug'])
\ No newline at end of file
+    uvicorn.run(app, host=settings.api_settings['host'], port=settings.api_settings['port'], debug=settings.api_settings['debug'])
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+from typing import Optional
+from core.release_plan import ReleaseConfigError
+from core.result_cache import ReleaseResultCache, release_fingerprint
+
+router = APIRouter()
+result_cache = ReleaseResultCache()
+
+def etag_for(result_key: str) -> str:
+    return f'"{result_key}"'
+
+def if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+def cached_result_response(request: Request, result_key: str) -> Optional[Response]:
+    """304 or the cached rows for `result_key`; None when nothing is cached under it."""
+    etag = etag_for(result_key)
+    # The key covers every tag commit and setting the rows depend on, so a 304 only needs the key to be cached
+    # (checked first: '*' must not answer for a release that was never computed)
+    if if_none_match(request, etag):
+        if not result_cache.has(result_key):
+            return None
+        return Response(status_code=304, headers={'ETag': etag})
+    body = result_cache.get(result_key)
+    if body is None:
+        return None
+    return Response(body, media_type='application/json', headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+def _release(request: Request, latest_version: Optional[str], previous_version: Optional[str], run: bool) -> Response:
+    # Imported here so the task executor is only started by the routers that need it
+    from api.task_manager import task_queue
+    try:
+        fingerprint = release_fingerprint(latest_version, previous_version)
+    except ReleaseConfigError as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    response = cached_result_response(request, fingerprint.key)
+    if response is not None:
+        return response
+    if not run:
+        # A run writes to the shared output, so a plain GET never starts one
+        return JSONResponse({"error": "release not computed", "result_key": fingerprint.key,
+                             "hint": "repeat with ?run=true to queue a run"}, status_code=404)
+    # Not computed for these tag commits yet: queue a run (identical requests share it)
+    task_id = task_queue.add_task({'latest_version': fingerprint.latest_version,
+                                   'previous_version': fingerprint.previous_version or ''})
+    return JSONResponse({"status": "pending", "task_id": task_queue.execution_id(task_id),
+                         "result_key": fingerprint.key}, status_code=202)
+
+# `?run=true` queues a release run on a miss; the run appends the release to the shared output like any other task
+
+@router.get("/latest")
+def get_latest_release(request: Request, run: bool = False) -> Response:
+    return _release(request, None, None, run)
+
+@router.get("/{previous_version}/{latest_version}")
+def get_release(request: Request, previous_version: str, latest_version: str, run: bool = False) -> Response:
+    return _release(request, latest_version, previous_version, run)
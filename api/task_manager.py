@@ -1,25 +1,71 @@
 from fastapi import APIRouter
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from tasks.task_queue import TaskQueue
 from tasks.task_executor import TaskExecutor
+from api.event_stream import TaskEventBroker, stream_queued_events
+from api.release_results import cached_result_response
+from config.settings import settings
+from utils.event_bus import EventBus
 from typing import Dict
 
 router = APIRouter()
 task_queue = TaskQueue()
-task_executor = TaskExecutor(task_queue)
+event_bus = EventBus()
+event_broker = TaskEventBroker(event_bus)
+# In 'workers' mode the API only enqueues and reports; `python -m tasks.worker` processes execute
+task_executor = TaskExecutor(task_queue, event_bus=event_bus) if settings.task_execution == 'inline' else None
 
 @router.post("/tasks/")
 def create_task(task_data: Dict[str, str]) -> dict:
-    task_id = task_queue.add_task(task_data)
-    return {"task_id": task_id}
+    # Optional "priority" (higher runs first); identical pending/running requests share one execution
+    try:
+        priority = int(task_data.pop('priority', 0) or 0)
+    except ValueError:
+        return {"error": "priority must be an integer"}
+    task_id = task_queue.add_task(task_data, priority=priority)
+    execution_id = task_queue.execution_id(task_id)
+    return {"task_id": task_id, "coalesced_with": execution_id if execution_id != task_id else None}
 
 @router.get("/tasks/{task_id}")
 def get_task_status(task_id: str) -> dict:
     task = task_queue.get_task(task_id)
     if task:
-        return {"task_id": task_id, "status": task.status}
+        return task.to_dict()
     else:
         return {"error": "task not found"}
 
+@router.get("/tasks/{task_id}/result")
+def get_task_result(task_id: str, request: Request) -> Response:
+    task = task_queue.get_task(task_id)
+    if task is None:
+        return JSONResponse({"error": "task not found"}, status_code=404)
+    result_key = (task.result or {}).get('result_key')
+    if task.status != 'completed' or not result_key:
+        return JSONResponse({"status": task.status, "error": task.error}, status_code=202 if task.status in ('pending', 'running') else 404)
+    response = cached_result_response(request, result_key)
+    if response is None:
+        return JSONResponse({"error": "result no longer cached"}, status_code=404)
+    return response
+
+@router.get("/tasks/{task_id}/events")
+def stream_task_events(task_id: str) -> Response:
+    task = task_queue.get_task(task_id)
+    if task is None:
+        return JSONResponse({"error": "task not found"}, status_code=404)
+    # Coalesced requests follow the events of the execution they share
+    task_id = task.leader_id or task_id
+    if task_executor is None:
+        return StreamingResponse(stream_queued_events(task_queue, task_id), media_type='text/event-stream',
+                                 headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    if task.status in ('completed', 'failed') and not event_broker.history.get(task_id):
+        # Finished before its history was kept (or after it was evicted): report the final state only
+        final_event = {'event': f'task_{task.status}', 'task_id': task_id, 'status': task.status,
+                       'result': task.result, 'error': task.error}
+        return StreamingResponse(iter([event_broker.format_event(final_event)]), media_type='text/event-stream')
+    return StreamingResponse(event_broker.stream(task_id), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @router.delete("/tasks/{task_id}")
 def delete_task(task_id: str) -> dict:
     success = task_queue.delete_task(task_id)
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+"""
+Benchmarks module initialization.
+"""
@@ -0,0 +1,66 @@
+# benchmarks/git_backend_benchmark.py
+#
+# Compares the 'subprocess' and 'batch' GitHandler backends on the lookups a release
+# run performs: tag resolution per repository and HEAD/commit reads per Excel row.
+#
+#   python -m benchmarks.git_backend_benchmark [--repos N] [--rows N] [REPO_PATH ...]
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict
+from core.git_handler import GitHandler, get_git_spawn_count
+from core.git_batch import batch_pool
+
+def _create_repo(path: Path, commits: int = 5) -> None:
+    env = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+    path.mkdir(parents=True)
+    subprocess.run(['git', 'init', '-q'], cwd=path, check=True, env=env)
+    for i in range(commits):
+        (path / 'file.txt').write_text(f'{i}\n')
+        subprocess.run(['git', 'add', 'file.txt'], cwd=path, check=True, env=env)
+        subprocess.run(['git', 'commit', '-q', '-m', f'change {i}'], cwd=path, check=True, env=env)
+        subprocess.run(['git', 'tag', f'v{i}'], cwd=path, check=True, env=env)
+
+def run_workload(repo_paths: List[str], rows: int, backend: str) -> Dict[str, float]:
+    spawns_before = get_git_spawn_count()
+    start = time.perf_counter()
+    for repo_path in repo_paths:
+        handler = GitHandler(repo_path, backend=backend)
+        handler.resolve_tag('v0')
+        head = handler.get_latest_commit_id()
+        handler.get_commit_message(head)
+    for row in range(rows):
+        handler = GitHandler(repo_paths[row % len(repo_paths)], backend=backend)
+        handler.get_latest_commit_id()
+    elapsed = time.perf_counter() - start
+    batch_pool.close_all()
+    return {'spawns': get_git_spawn_count() - spawns_before, 'seconds': elapsed}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare GitHandler backends')
+    parser.add_argument('repo_paths', nargs='*', help='Existing repositories to use (default: synthetic repos)')
+    parser.add_argument('--repos', type=int, default=20, help='Number of synthetic repositories')
+    parser.add_argument('--rows', type=int, default=500, help='Number of per-row HEAD lookups')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo_paths = args.repo_paths
+        if not repo_paths:
+            for i in range(args.repos):
+                _create_repo(Path(tmp_dir) / f'repo{i}')
+            repo_paths = [str(Path(tmp_dir) / f'repo{i}') for i in range(args.repos)]
+
+        results = {backend: run_workload(repo_paths, args.rows, backend) for backend in ('subprocess', 'batch')}
+
+    for backend, result in results.items():
+        print(f"{backend:>10}: {result['spawns']:6d} git processes, {result['seconds']:.3f}s")
+    saved = results['subprocess']['spawns'] - results['batch']['spawns']
+    print(f"batch backend saves {saved} git processes per run")
+
+if __name__ == '__main__':
+    main()
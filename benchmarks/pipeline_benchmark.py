@@ -0,0 +1,199 @@
+# benchmarks/pipeline_benchmark.py
+#
+# Times the release pipeline stage by stage on a synthetic workspace and writes the
+# results as JSON, so runs of different versions can be compared.
+#
+#   python -m benchmarks.pipeline_benchmark [--repos N] [--projects N] [--commits N]
+#          [--repeat N] [--output results.json] [--compare baseline.json]
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import settings, RepositoryInfo, CommitInfo
+from core.git_handler import GitHandler, get_git_spawn_count
+from core.git_batch import batch_pool
+from core.ref_snapshot import ref_snapshot_cache
+from core.repository_scanner import RepositoryScanner, ScanJob
+from core.patch_manager import PatchManager
+from core.commit_analyzer import CommitAnalyzer
+from core.excel_writer import ExcelWriter
+from core.release_context import ReleaseContext
+from core.release_pipeline import resolve_grt_versions, run_release_pipeline
+from benchmarks.workspace import WorkspaceSpec, build_workspace, workspace_overrides, override_settings, ensure_output_dir
+
+STAGES = ['manifest_parsing', 'tag_resolution', 'log_extraction', 'patch_generation', 'commit_analysis', 'excel_writing']
+
+class StageTimer:
+    """Per-iteration totals per stage; a stage measured several times in one iteration is summed."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[Dict[str, float]]] = {}
+        self.current: Dict[str, Dict[str, float]] = {}
+
+    def measure(self, stage: str, func: Callable[[], Any]) -> Any:
+        spawns_before = get_git_spawn_count()
+        start = time.perf_counter()
+        result = func()
+        sample = self.current.setdefault(stage, {'seconds': 0.0, 'git_processes': 0})
+        sample['seconds'] += time.perf_counter() - start
+        sample['git_processes'] += get_git_spawn_count() - spawns_before
+        return result
+
+    def finish_iteration(self) -> None:
+        for stage, sample in self.current.items():
+            self.samples.setdefault(stage, []).append(sample)
+        self.current = {}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for stage, samples in self.samples.items():
+            seconds = [sample['seconds'] for sample in samples]
+            summary[stage] = {
+                'min_seconds': min(seconds),
+                'median_seconds': statistics.median(seconds),
+                'max_seconds': max(seconds),
+                'git_processes': samples[-1]['git_processes'],
+            }
+        return summary
+
+def _run_stages(timer: StageTimer, output_root: Path) -> Dict[str, int]:
+    # Cold caches for every iteration
+    ref_snapshot_cache.clear()
+    batch_pool.close_all()
+    _, latest_version, previous_version = timer.measure('tag_resolution', resolve_grt_versions)
+    scanner = RepositoryScanner(latest_version, previous_version, workers=1, patch_output_dir=str(output_root / 'patches'))
+    jobs: List[ScanJob] = timer.measure('manifest_parsing', scanner.build_jobs)
+
+    def resolve_tags() -> List[ScanJob]:
+        valid = []
+        for job in jobs:
+            snapshot = GitHandler(job.path).get_ref_snapshot()
+            if snapshot.has_tag(job.tag_prefix + latest_version) and snapshot.has_tag(job.tag_prefix + previous_version):
+                valid.append(job)
+        return valid
+    valid_jobs = timer.measure('tag_resolution', resolve_tags)
+
+    def extract_logs() -> List[RepositoryInfo]:
+        repositories = []
+        for job in valid_jobs:
+            commits = [CommitInfo(commit_id=commit['commit_id'], message=commit['message'])
+                       for commit in GitHandler(job.path).iter_commit_logs_between_tags(
+                           job.tag_prefix + previous_version, job.tag_prefix + latest_version)]
+            repositories.append(RepositoryInfo(name=job.name, path=job.path, parent=job.parent,
+                                               latest_tag=job.tag_prefix + latest_version,
+                                               previous_tag=job.tag_prefix + previous_version, commits=commits))
+        return repositories
+    repositories = timer.measure('log_extraction', extract_logs)
+
+    def generate_patches() -> int:
+        patches = 0
+        for job, repo in zip(valid_jobs, repositories):
+            if not job.generate_patches or not repo.commits:
+                continue
+            messages = {commit.commit_id: commit.message for commit in repo.commits}
+            patch_map = PatchManager(job.path, repo.previous_tag, repo.latest_tag).generate_patch_map(
+                str(scanner.patch_dir_for(job)), messages)
+            for commit in repo.commits:
+                patch_file = patch_map.get(commit.commit_id)
+                commit.patch_file = str(patch_file) if patch_file else None
+            patches += len(patch_map)
+        return patches
+    patches = timer.measure('patch_generation', generate_patches)
+
+    timer.measure('commit_analysis', lambda: CommitAnalyzer().analyze_commits(repositories))
+
+    excel_path = Path(settings.excel_output_path)
+    excel_path.unlink(missing_ok=True)
+
+    def write_excel() -> None:
+        context = ReleaseContext.resolve(latest_git_tag=repositories[-1].latest_tag if repositories else '')
+        ExcelWriter(str(excel_path), release_context=context).write_commits(repositories)
+    timer.measure('excel_writing', write_excel)
+    shutil.rmtree(output_root / 'patches', ignore_errors=True)
+    return {'scan_jobs': len(jobs), 'repositories': len(repositories),
+            'commits': sum(len(repo.commits) for repo in repositories), 'patches': patches}
+
+def run_benchmark(spec: WorkspaceSpec, repeat: int, end_to_end: bool, workspace: Optional[str] = None,
+                  git_log_backend: str = 'cli') -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(workspace or tmp_dir)
+        build_start = time.perf_counter()
+        repositories = build_workspace(root, spec)
+        build_seconds = time.perf_counter() - build_start
+        overrides = workspace_overrides(root, repositories)
+        overrides['git_log_backend'] = git_log_backend
+        ensure_output_dir(overrides)
+        timer = StageTimer()
+        with override_settings(**overrides):
+            for _ in range(repeat):
+                counts = _run_stages(timer, root / 'output')
+                timer.finish_iteration()
+            if end_to_end:
+                for _ in range(repeat):
+                    Path(settings.excel_output_path).unlink(missing_ok=True)
+                    ref_snapshot_cache.clear()
+                    batch_pool.close_all()
+                    timer.measure('end_to_end', lambda: run_release_pipeline(
+                        excel_output_path=settings.excel_output_path))
+                    timer.finish_iteration()
+                    shutil.rmtree(Path(settings.patch_output_dir), ignore_errors=True)
+        batch_pool.close_all()
+
+    git_version = subprocess.run(['git', '--version'], stdout=subprocess.PIPE, text=True).stdout.strip()
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'git': git_version},
+        'workspace': spec.to_dict(),
+        'git_log_backend': git_log_backend,
+        'workspace_build_seconds': build_seconds,
+        'repeat': repeat,
+        'counts': counts,
+        'stages': timer.summary(),
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    for stage, stats in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous or not previous['median_seconds']:
+            continue
+        ratio = stats['median_seconds'] / previous['median_seconds']
+        print(f"{stage:>18}: {previous['median_seconds']:.3f}s -> {stats['median_seconds']:.3f}s ({ratio:.2f}x)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the release pipeline on a synthetic workspace')
+    parser.add_argument('--repos', type=int, default=3, help='Top-level repositories with a manifest')
+    parser.add_argument('--projects', type=int, default=20, help='Manifest projects per repository')
+    parser.add_argument('--tags', type=int, default=2, help='Release tags per repository')
+    parser.add_argument('--commits', type=int, default=10, help='Commits between consecutive tags')
+    parser.add_argument('--repeat', type=int, default=3, help='Iterations per stage')
+    parser.add_argument('--no-end-to-end', action='store_true', help='Skip timing run_release_pipeline as a whole')
+    parser.add_argument('--git-log-backend', choices=['cli', 'objects'], default='cli',
+                        help='How commits between tags are listed')
+    parser.add_argument('--workspace', help='Build the workspace here instead of a temporary directory')
+    parser.add_argument('--output', default='pipeline_benchmark.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    spec = WorkspaceSpec(repos=args.repos, projects=args.projects, tags=max(2, args.tags), commits=args.commits)
+    results = run_benchmark(spec, max(1, args.repeat), not args.no_end_to_end, args.workspace, args.git_log_backend)
+    Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    print(f"{results['counts']['repositories']} repositories, {results['counts']['commits']} commits, "
+          f"{results['counts']['patches']} patches")
+    for stage in STAGES + ['end_to_end']:
+        stats = results['stages'].get(stage)
+        if stats:
+            print(f"{stage:>18}: {stats['median_seconds']:.3f}s median, {stats['git_processes']} git processes")
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+    print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
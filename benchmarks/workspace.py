@@ -0,0 +1,125 @@
+# benchmarks/workspace.py
+#
+# Builds a synthetic release workspace: top-level repositories and manifest projects with
+# release tags, plus the manifest XML and a Settings override pointing the pipeline at it.
+
+import os
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+from config.settings import settings, RepositoryConfig
+
+TAG_PREFIX = 'release-spm.mt8678_'
+
+# A share of the messages hits the classifier rules, as in real releases
+MESSAGE_TEMPLATES = [
+    '[ALPS{n}] driver: fix timeout in {repo}',
+    '[ALPS{n}] build: update dependencies of {repo}',
+    '[ALPS{n}] thyp-sdk: sync hypervisor sdk',
+    '[ALPS{n}] media: tune buffer sizes in {repo}\n\nLonger description of the change\nwith several lines.',
+    '[ALPS{n}] tee: update trusted application',
+    '[ALPS{n}] kernel: backport scheduler fix',
+]
+
+@dataclass
+class WorkspaceSpec:
+    repos: int = 3               # Top-level repositories besides grt, each with its own manifest
+    projects: int = 20           # Manifest projects per top-level repository
+    tags: int = 2                # Release tags; the benchmark scans the last two
+    commits: int = 10            # Commits per repository between consecutive tags
+    file_lines: int = 50         # Size of the file touched by every commit
+
+    def version(self, index: int) -> str:
+        return f"2024_{1 + index // 28:02d}{1 + index % 28:02d}_01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+def _fast_import_stream(spec: WorkspaceSpec, name: str) -> bytes:
+    # One git fast-import process per repository instead of several git calls per commit
+    lines: List[bytes] = []
+    timestamp = 1700000000
+    mark = 0
+    content = [f'{name} line {i}' for i in range(spec.file_lines)]
+
+    def data(payload: str) -> None:
+        encoded = payload.encode('utf-8')
+        lines.append(b'data %d\n' % len(encoded) + encoded + b'\n')
+
+    for tag_index in range(spec.tags):
+        for commit_index in range(spec.commits if tag_index else 1):
+            mark += 1
+            timestamp += 60
+            n = tag_index * spec.commits + commit_index
+            content[n % spec.file_lines] = f'{name} line {n % spec.file_lines} rev {n}'
+            lines.append(b'commit refs/heads/master\n')
+            lines.append(b'mark :%d\n' % mark)
+            lines.append(b'committer bench <bench@example.com> %d +0000\n' % timestamp)
+            data(MESSAGE_TEMPLATES[n % len(MESSAGE_TEMPLATES)].format(n=n, repo=name) if tag_index else 'initial import')
+            if mark > 1:
+                lines.append(b'from :%d\n' % (mark - 1))
+            lines.append(b'M 644 inline file.txt\n')
+            data('\n'.join(content) + '\n')
+        lines.append(f'reset refs/tags/{TAG_PREFIX}{spec.version(tag_index)}\n'.encode('utf-8'))
+        lines.append(b'from :%d\n\n' % mark)
+    return b''.join(lines)
+
+def create_repository(path: Path, spec: WorkspaceSpec) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(['git', 'init', '-q'], cwd=path, check=True)
+    subprocess.run(['git', 'symbolic-ref', 'HEAD', 'refs/heads/master'], cwd=path, check=True)
+    subprocess.run(['git', 'fast-import', '--quiet'], cwd=path, check=True,
+                   input=_fast_import_stream(spec, path.name))
+
+def build_workspace(root: Path, spec: WorkspaceSpec) -> List[RepositoryConfig]:
+    """Create the repositories under root and return the RepositoryConfig list describing them."""
+    repositories: List[RepositoryConfig] = []
+    for repo_index in range(spec.repos):
+        name = f'repo{repo_index}'
+        repo_path = root / name
+        create_repository(repo_path, spec)
+        manifest_path = repo_path / '.repo' / 'manifests' / 'default.xml'
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        projects = []
+        for project_index in range(spec.projects):
+            project_path = f'vendor/project{project_index}'
+            create_repository(repo_path / project_path, spec)
+            projects.append(f'  <project name="{name}-project{project_index}" path="{project_path}"/>')
+        manifest_path.write_text('<manifest>\n' + '\n'.join(projects) + '\n</manifest>\n', encoding='utf-8')
+        repositories.append(RepositoryConfig(name=name, path=str(repo_path), manifest=str(manifest_path),
+                                             tag_prefix=TAG_PREFIX))
+    create_repository(root / 'grt', spec)
+    repositories.append(RepositoryConfig(name='grt', path=str(root / 'grt'), manifest='', tag_prefix=TAG_PREFIX))
+    return repositories
+
+def workspace_overrides(root: Path, repositories: List[RepositoryConfig]) -> Dict[str, Any]:
+    output_dir = root / 'output'
+    return {
+        'repositories': repositories,
+        'excel_output_path': str(output_dir / 'output.xlsx'),
+        'patch_output_dir': str(output_dir / 'patches'),
+        'log_file': str(output_dir / 'benchmark.log'),
+        'state_store_path': str(output_dir / 'release_state.sqlite3'),
+        'specific_commit_repos': [repositories[0].path],
+        'specific_commit_base_path': str(root),
+        # Measure the full work every time
+        'incremental_runs': False,
+        'manifest_cache_enabled': False,
+        'console_mode': 'summary',
+    }
+
+@contextmanager
+def override_settings(**overrides: Any) -> Iterator[None]:
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+def ensure_output_dir(overrides: Dict[str, Any]) -> None:
+    os.makedirs(Path(overrides['excel_output_path']).parent, exist_ok=True)
@@ -32,17 +32,83 @@ class Settings:
     api_settings: Dict[str, Any] = field(default_factory=dict)
     log_level: str = 'DEBUG'  # Added log level configuration
     log_file: str = 'release_note_generator.log'  # Added log file configuration
+    # 'verbose' prints every commit to the console, 'summary' prints per-repository totals
+    console_mode: str = 'verbose'
     # New configurations for Excel writing
     excel_output_path: str = '/home/nebula/Release_Generator/output.xlsx'
+    # Row output: 'xlsx', or 'csv' / 'jsonl' / 'sqlite' streamed next to excel_output_path with the matching suffix
+    output_format: str = 'xlsx'
+    # Rows for commits already in the output: 'skip' them, 'update' the existing rows (SQLite and workbook mode; skipped elsewhere)
+    # or 'append' duplicates. Known commit ids are kept in <output>.commit-index
+    duplicate_commits: str = 'skip'
+    # Root for generated patches; every run writes into its own sub-directory
+    patch_output_dir: str = '/home/nebula/Release_Generator/patches'
+    # Patches keyed by `git patch-id --stable` and shared across repositories and runs (<patch_output_dir>/store by default)
+    patch_store_enabled: bool = True
+    patch_store_dir: str = ''
+    patch_store_spool_size: int = 1024 * 1024
+    # Spooled patches waiting for an id; at this many the patch-id process is finished and a new one started
+    patch_store_max_pending: int = 32
+    # Reuse repositories/projects already processed for the same tag pair (SQLite, next to the Excel output by default)
+    incremental_runs: bool = True
+    state_store_path: str = ''
+    # Cache of parsed manifest project lists, invalidated when any manifest/include file changes
+    manifest_cache_enabled: bool = True
+    manifest_cache_path: str = ''
+    # 'workbook' loads and rewrites output.xlsx with openpyxl, 'append' streams new rows into the existing sheet
+    excel_write_mode: str = 'append'
+    # Number of repositories/manifest projects scanned concurrently (1 = serial scan)
+    scan_workers: int = 8
+    # Directory served by the /files endpoints and the chunk size used to stream uploads into it
+    upload_dir: str = 'uploads'
+    upload_chunk_size: int = 1024 * 1024
+    # JSON report of stage timings, git processes/bytes and Excel save time for each run (next to the Excel output by default)
+    run_report_enabled: bool = True
+    run_report_path: str = ''
+    # Release rows served by the /releases endpoints, keyed by the commits every tag resolves to (next to the Excel output by default)
+    result_cache_enabled: bool = True
+    result_cache_path: str = ''
+    # Number of release tasks the API executes at the same time
+    task_workers: int = 2
+    # SQLite task queue (next to the Excel output by default); tasks interrupted this many times are not re-queued
+    task_queue_path: str = ''
+    task_max_attempts: int = 3
+    # 'inline' runs tasks on API threads, 'workers' leaves them to `python -m tasks.worker` processes sharing the queue
+    # (their runs are missing from the API's /metrics; see the run reports instead)
+    task_execution: str = 'inline'
+    # Workers hold a task for this long without a heartbeat before it is queued again; idle workers poll at task_poll_interval
+    task_lease_seconds: float = 60.0
+    task_poll_interval: float = 1.0
+    # Git backend for GitHandler lookups: 'subprocess' (one git process per call) or 'batch' (persistent cat-file processes)
+    git_backend: str = 'batch'
+    git_batch_max_processes: int = 64
+    # 'cli' lists commits between tags with git log, 'objects' reads packs/loose objects in-process (git log as fallback)
+    git_log_backend: str = 'cli'
+    # Repositories whose object stores (two mmaps per pack plus parsed commits) stay open; the least recently used are closed
+    object_store_max_open: int = 64
     parent_repo_mapping: Dict[str, str] = field(default_factory=lambda: {
         '] thyp-sdk: ': 'nebula-hyper',
         '] nebula-sdk: ': 'nebula-sdk',
         '] tee: ': 'TEE',
         # Add more mappings as needed
     })
+    # Commits whose message contains any of these substrings are dropped from their repository
+    commit_remove_patterns: List[str] = field(default_factory=lambda: [
+        '] thyp-sdk: ',
+        '] nebula-sdk: ',
+        '] tee: ',
+    ])
+    # Repositories (and their manifest projects) whose commits get the collected patches and parent repos
+    force_update_repos: List[str] = field(default_factory=lambda: ['grpower', 'nebula'])
     deletable_repos: List[str] = field(default_factory=lambda: [
         'prebuilt/hypervisor/grt'
     ])  # Updated to store substrings
+    # Repositories whose HEAD commit ids are listed in column F, shown relative to the base path
+    specific_commit_repos: List[str] = field(default_factory=lambda: [
+        '/home/nebula/grpower/workspace/nebula/zircon',
+        '/home/nebula/grpower/workspace/nebula/garnet'
+    ])
+    specific_commit_base_path: str = '/home/nebula'
     responsible_person_info: str = 'Tester / Modifier / MTK Owner'
     submission_time_format: str = '%Y-%m-%d %H:%M:%S'
     porting_status_options: Dict[str, str] = field(default_factory=lambda: {
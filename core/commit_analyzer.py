@@ -0,0 +1,74 @@
+# core/commit_analyzer.py
+
+from typing import List, Optional, Set
+from config.settings import RepositoryInfo, CommitInfo
+from core.commit_classifier import CommitClassifier, get_commit_classifier
+from utils.logger import get_logger, verbose_console
+from rich.console import Console
+
+class CommitAnalyzer:
+    def __init__(self, classifier: Optional[CommitClassifier] = None) -> None:
+        self.logger = get_logger('CommitAnalyzer')
+        self.console = Console()
+        self.verbose = verbose_console()
+        self.target_patch_paths: List[str] = []  # Store collected patch file paths
+        self.collected_parent_repos: Set[str] = set()  # Store collected parent repositories
+        # Removal, parent-repo and target-repo rules compiled from settings
+        self.classifier = classifier or get_commit_classifier()
+
+    def analyze_commits(self, repositories: List[RepositoryInfo]) -> None:
+        self.logger.info("Starting commit analysis")
+        self.console.log("[bold blue]Starting commit analysis[/bold blue]")
+
+        # First pass: collect patch files and parent repos from commits to remove
+        for repo in repositories:
+            self.logger.debug("Scanning repository: %s, Path: %s", repo.name, repo.path)
+            kept_commits: List[CommitInfo] = []
+            for commit in repo.commits:
+                classification = self.classifier.classify(commit.message)
+                if not classification.remove:
+                    kept_commits.append(commit)
+                    continue
+                if commit.patch_file:
+                    self.target_patch_paths.append(commit.patch_file)
+                    self.logger.debug("Collected patch: %s from commit: %s", commit.patch_file, commit.commit_id)
+                for parent_repo in classification.parent_repos:
+                    self.collected_parent_repos.add(parent_repo)
+                    self.logger.debug("Collected parent repo '%s' from commit: %s", parent_repo, commit.commit_id)
+                self.logger.debug("Removed commit: %s from repository: %s", commit.commit_id, repo.name)
+            if len(kept_commits) != len(repo.commits):
+                repo.commits = kept_commits
+
+        # Second pass: force update all commits in target repositories
+        for repo in repositories:
+            self.logger.debug("Processing repository for updates: %s", repo.name)
+            if self.classifier.is_target_repo(repo):
+                self._force_update_patches_and_parents(repo)
+
+    def _force_update_patches_and_parents(self, repo: RepositoryInfo) -> None:
+        self.logger.info(f"Forcing patch and parent repo updates for repository: {repo.name}")
+        self.console.log(f"[cyan]Repository: {repo.name}[/cyan]")
+
+        # Concatenate collected patch file paths
+        concatenated_patches: str = '\n'.join(self.target_patch_paths)
+        # Convert collected parent repos to a list
+        collected_parent_repos_list: List[str] = list(self.collected_parent_repos)
+
+        for commit in repo.commits:
+            self.logger.debug("Before update - Commit ID: %s, Current patch: %s, Current parent_repos: %s",
+                              commit.commit_id, commit.patch_file, commit.parent_repos)
+            # Force update patch_file
+            commit.patch_file = concatenated_patches
+            # Force update parent_repos
+            commit.parent_repos = collected_parent_repos_list
+            self.logger.debug("After update - Commit ID: %s, Forced patch: %s, Forced parent_repos: %s",
+                              commit.commit_id, commit.patch_file, commit.parent_repos)
+
+            # Console output for visibility
+            if self.verbose:
+                self.console.log(f"[yellow]Commit ID: {commit.commit_id}[/yellow]")
+                self.console.log(f"[green]Forced patch path: {commit.patch_file}[/green]")
+                self.console.log(f"[green]Forced parent_repos: {', '.join(commit.parent_repos)}[/green]")
+        if not self.verbose:
+            self.console.log(f"[green]Forced {len(self.target_patch_paths)} patch(es) and "
+                             f"{len(collected_parent_repos_list)} parent repo(s) onto {len(repo.commits)} commit(s)[/green]")
@@ -0,0 +1,56 @@
+# core/commit_classifier.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings, RepositoryInfo
+
+@dataclass
+class CommitClassification:
+    remove: bool = False
+    parent_repos: List[str] = field(default_factory=list)
+
+class CommitClassifier:
+    """All commit-message rules compiled into one pattern, built once from configuration.
+
+    Most commits match none of the rules, so a single regex search over the message
+    settles them; only matching messages are checked rule by rule.
+    """
+
+    def __init__(self, parent_repo_mapping: Optional[Dict[str, str]] = None,
+                 remove_patterns: Optional[List[str]] = None,
+                 target_repos: Optional[List[str]] = None) -> None:
+        self.parent_repo_mapping = dict(settings.parent_repo_mapping if parent_repo_mapping is None else parent_repo_mapping)
+        self.remove_patterns = list(settings.commit_remove_patterns if remove_patterns is None else remove_patterns)
+        self.target_repos = frozenset(settings.force_update_repos if target_repos is None else target_repos)
+        # (pattern, removes commit, parent repo) in configuration order
+        self.rules: List[Tuple[str, bool, Optional[str]]] = []
+        for pattern in dict.fromkeys(list(self.parent_repo_mapping) + self.remove_patterns):
+            self.rules.append((pattern, pattern in self.remove_patterns, self.parent_repo_mapping.get(pattern)))
+        # Longest first so a pattern is never shadowed by one of its own prefixes
+        alternatives = sorted((re.escape(pattern) for pattern, _, _ in self.rules), key=len, reverse=True)
+        self.combined_pattern = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def classify(self, message: str) -> CommitClassification:
+        if self.combined_pattern is None or self.combined_pattern.search(message) is None:
+            # A fresh result each time: callers may keep or extend parent_repos
+            return CommitClassification()
+        remove = False
+        parent_repos: List[str] = []
+        for pattern, removes, parent_repo in self.rules:
+            if pattern in message:
+                remove = remove or removes
+                if parent_repo and parent_repo not in parent_repos:
+                    parent_repos.append(parent_repo)
+        return CommitClassification(remove=remove, parent_repos=parent_repos)
+
+    def is_target_repo(self, repo: RepositoryInfo) -> bool:
+        return repo.name in self.target_repos or (repo.parent is not None and repo.parent in self.target_repos)
+
+_default_classifier: Optional[CommitClassifier] = None
+
+def get_commit_classifier() -> CommitClassifier:
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = CommitClassifier()
+    return _default_classifier
@@ -0,0 +1,103 @@
+# core/commit_index.py
+
+import os
+import re
+import uuid
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Set
+from zipfile import ZipFile
+from core.excel_appender import ExcelAppender, MAIN_NS
+
+COMMIT_COLUMN_RE = re.compile(r'O\d+$')  # Column O holds the Commit ID
+INDEX_HEADER = 'commit-index v1'
+
+def iter_xlsx_commit_ids(path: str) -> Iterator[str]:
+    """Column O values of the active sheet, read from the sheet XML without building a workbook."""
+    with ZipFile(path) as source:
+        sheet_name = ExcelAppender._active_sheet_member(source)
+        inline_ids = []
+        shared_indexes = []
+        with source.open(sheet_name) as stream:
+            for _, element in ET.iterparse(stream):
+                if element.tag == f'{{{MAIN_NS}}}c' and COMMIT_COLUMN_RE.match(element.get('r', '')):
+                    cell_type = element.get('t')
+                    if cell_type == 's':
+                        value = element.findtext(f'{{{MAIN_NS}}}v')
+                        if value is not None:
+                            shared_indexes.append(int(value))
+                    elif cell_type == 'inlineStr':
+                        inline_ids.append(''.join(node.text or '' for node in element.iter(f'{{{MAIN_NS}}}t')))
+                    else:
+                        inline_ids.append(element.findtext(f'{{{MAIN_NS}}}v') or '')
+                elif element.tag == f'{{{MAIN_NS}}}row':
+                    element.clear()
+        yield from inline_ids
+        if shared_indexes and 'xl/sharedStrings.xml' in source.namelist():
+            # Only the strings referenced from column O are kept
+            wanted = set(shared_indexes)
+            with source.open('xl/sharedStrings.xml') as stream:
+                position = 0
+                for _, element in ET.iterparse(stream):
+                    if element.tag == f'{{{MAIN_NS}}}si':
+                        if position in wanted:
+                            yield ''.join(node.text or '' for node in element.iter(f'{{{MAIN_NS}}}t'))
+                        position += 1
+                        element.clear()
+
+class CommitIndex:
+    """Commit IDs already present in an output, kept in a sidecar file next to it.
+
+    The sidecar records the output's size and mtime; when the output was changed
+    by anything else (edited by hand, replaced) the index is rebuilt from it.
+    """
+
+    def __init__(self, output_path: Path, commit_ids: Optional[Set[str]] = None) -> None:
+        self.output_path = output_path
+        self.sidecar_path = output_path.with_name(output_path.name + '.commit-index')
+        self.commit_ids: Set[str] = commit_ids if commit_ids is not None else set()
+
+    @classmethod
+    def load(cls, output_path: Path, scan: Callable[[], Iterable[str]]) -> 'CommitIndex':
+        """Index for `output_path`, from the sidecar when it is current, otherwise by calling `scan`."""
+        if not output_path.exists():
+            return cls(output_path)
+        index = cls(output_path)
+        commit_ids = index._read_sidecar()
+        if commit_ids is not None:
+            index.commit_ids = commit_ids
+            return index
+        index.commit_ids = {commit_id for commit_id in scan() if commit_id and commit_id != 'Commit ID'}
+        index.save()
+        return index
+
+    def _signature(self) -> str:
+        stat = self.output_path.stat()
+        return f'{stat.st_size} {stat.st_mtime_ns}'
+
+    def _read_sidecar(self) -> Optional[Set[str]]:
+        try:
+            with self.sidecar_path.open(encoding='utf-8') as f:
+                header = f.readline().rstrip('\n')
+                if header != f'{INDEX_HEADER} {self._signature()}':
+                    return None
+                return {line.rstrip('\n') for line in f if line.strip()}
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def __contains__(self, commit_id: str) -> bool:
+        return commit_id in self.commit_ids
+
+    def add(self, commit_id: str) -> None:
+        self.commit_ids.add(commit_id)
+
+    def save(self) -> None:
+        """Write the sidecar for the output as it is now; call after the output has been written."""
+        if not self.output_path.exists():
+            return
+        tmp_path = self.sidecar_path.with_name(f'.{self.sidecar_path.name}.{uuid.uuid4().hex}')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            f.write(f'{INDEX_HEADER} {self._signature()}\n')
+            for commit_id in sorted(self.commit_ids):
+                f.write(f'{commit_id}\n')
+        os.replace(tmp_path, self.sidecar_path)
@@ -0,0 +1,209 @@
+# core/excel_appender.py
+
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+DIMENSION_RE = re.compile(rb'<dimension ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"\s*/>')
+ROW_NUMBER_RE = re.compile(rb'<row\b[^>]*?\sr="(\d+)"')
+SHEET_DATA_END = b'</sheetData>'
+SHEET_DATA_EMPTY = b'<sheetData/>'
+
+def column_letter(index: int) -> str:
+    """1-based column index to its Excel letter (1 -> 'A', 15 -> 'O')."""
+    letters = ''
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - 64)
+    return index
+
+class ExcelAppender:
+    """Append rows to the active sheet of an existing .xlsx without loading it into openpyxl.
+
+    The package is rewritten as a byte stream: unchanged parts are copied chunk by
+    chunk and the new rows (as inline strings) are spliced in before </sheetData>,
+    so memory stays bounded and no cell objects are built for existing rows.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def append_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        with ZipFile(self.path) as source:
+            sheet_name = self._active_sheet_member(source)
+            sheet_info = source.getinfo(sheet_name)
+            dimension, last_row = self._read_dimension(source, sheet_info)
+            if last_row is None:
+                last_row = self._scan_last_row(source, sheet_info)
+
+            with tempfile.SpooledTemporaryFile(max_size=8 * self.CHUNK_SIZE) as rows_xml:
+                row_count, max_columns = self._serialize_rows(rows, last_row + 1, rows_xml)
+                if row_count == 0:
+                    return 0
+                new_dimension = self._new_dimension(dimension, last_row + row_count, max_columns)
+
+                fd, tmp_name = tempfile.mkstemp(prefix=self.path.name, suffix='.tmp', dir=str(self.path.parent))
+                os.close(fd)
+                try:
+                    with ZipFile(tmp_name, 'w', ZIP_DEFLATED) as target:
+                        for info in source.infolist():
+                            if info.filename == sheet_name:
+                                self._copy_sheet(source, info, target, rows_xml, new_dimension)
+                            else:
+                                with source.open(info) as src, target.open(self._target_info(info), 'w', force_zip64=info.file_size > 0x7FFFFFFF) as dst:
+                                    shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+                    # mkstemp creates the file as 0600; keep the workbook's own permissions
+                    shutil.copymode(self.path, tmp_name)
+                    os.replace(tmp_name, self.path)
+                except BaseException:
+                    if os.path.exists(tmp_name):
+                        os.unlink(tmp_name)
+                    raise
+        return row_count
+
+    @staticmethod
+    def _target_info(info: ZipInfo) -> ZipInfo:
+        target_info = ZipInfo(info.filename, date_time=info.date_time)
+        target_info.compress_type = ZIP_DEFLATED
+        target_info.external_attr = info.external_attr
+        return target_info
+
+    @staticmethod
+    def _active_sheet_member(source: ZipFile) -> str:
+        workbook = ET.fromstring(source.read('xl/workbook.xml'))
+        active_tab = 0
+        view = workbook.find(f'{{{MAIN_NS}}}bookViews/{{{MAIN_NS}}}workbookView')
+        if view is not None:
+            active_tab = int(view.get('activeTab', '0'))
+        sheets = workbook.findall(f'{{{MAIN_NS}}}sheets/{{{MAIN_NS}}}sheet')
+        if not sheets:
+            raise ValueError("Workbook has no worksheets")
+        relation_id = sheets[min(active_tab, len(sheets) - 1)].get(f'{{{REL_NS}}}id')
+        relations = ET.fromstring(source.read('xl/_rels/workbook.xml.rels'))
+        for relation in relations.findall(f'{{{PACKAGE_REL_NS}}}Relationship'):
+            if relation.get('Id') == relation_id:
+                target = relation.get('Target', '')
+                if target.startswith('/'):
+                    return target.lstrip('/')
+                return posixpath.normpath(posixpath.join('xl', target))
+        raise ValueError(f"Worksheet relationship {relation_id} not found")
+
+    def _read_head(self, stream: BinaryIO) -> bytes:
+        # Everything up to <sheetData: sheet properties, dimension, column widths
+        head = b''
+        while b'<sheetData' not in head:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            head += chunk
+        return head
+
+    def _read_dimension(self, source: ZipFile, info: ZipInfo) -> Tuple[Optional[re.Match], Optional[int]]:
+        with source.open(info) as stream:
+            head = self._read_head(stream)
+        match = DIMENSION_RE.search(head.split(b'<sheetData', 1)[0])
+        if match is None:
+            return None, None
+        last_row = int(match.group(4) or match.group(2))
+        # A1 is also what an empty sheet reports; let the caller scan such tiny sheets
+        return match, (last_row if last_row > 1 else None)
+
+    def _scan_last_row(self, source: ZipFile, info: ZipInfo) -> int:
+        last_row = 0
+        carry = b''
+        with source.open(info) as stream:
+            while True:
+                chunk = stream.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = carry + chunk
+                for match in ROW_NUMBER_RE.finditer(data):
+                    last_row = max(last_row, int(match.group(1)))
+                carry = data[-256:]
+        return last_row
+
+    @staticmethod
+    def _serialize_rows(rows: Iterable[Sequence[Any]], first_row: int, output: BinaryIO) -> Tuple[int, int]:
+        count = 0
+        max_columns = 0
+        for row_number, row in enumerate(rows, start=first_row):
+            cells = []
+            for column, value in enumerate(row, start=1):
+                if value is None or value == '':
+                    continue
+                reference = f'{column_letter(column)}{row_number}'
+                if isinstance(value, bool):
+                    cells.append(f'<c r="{reference}" t="b"><v>{int(value)}</v></c>')
+                elif isinstance(value, (int, float)):
+                    cells.append(f'<c r="{reference}" t="n"><v>{value}</v></c>')
+                else:
+                    text = escape(str(value), {'"': '&quot;'})
+                    cells.append(f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+            output.write(f'<row r="{row_number}">{"".join(cells)}</row>'.encode('utf-8'))
+            max_columns = max(max_columns, len(row))
+            count += 1
+        output.seek(0)
+        return count, max_columns
+
+    @staticmethod
+    def _new_dimension(dimension: Optional[re.Match], last_row: int, max_columns: int) -> Optional[bytes]:
+        if dimension is None:
+            return None
+        start = dimension.group(1).decode() + dimension.group(2).decode()
+        end_column = dimension.group(3) or dimension.group(1)
+        end_letters = column_letter(max(column_index(end_column.decode()), max_columns))
+        return f'<dimension ref="{start}:{end_letters}{last_row}"/>'.encode()
+
+    def _copy_sheet(self, source: ZipFile, info: ZipInfo, target: ZipFile, rows_xml: BinaryIO,
+                    new_dimension: Optional[bytes]) -> None:
+        rows_xml.seek(0, os.SEEK_END)
+        force_zip64 = info.file_size + rows_xml.tell() > 0x7FFFFFFF
+        rows_xml.seek(0)
+        with source.open(info) as src, target.open(self._target_info(info), 'w', force_zip64=force_zip64) as dst:
+            buffer = self._read_head(src)
+            if new_dimension is not None:
+                head, sep, rest = buffer.partition(b'<sheetData')
+                buffer = DIMENSION_RE.sub(lambda _: new_dimension, head, count=1) + sep + rest
+            keep = len(SHEET_DATA_END) - 1
+            while True:
+                end = buffer.find(SHEET_DATA_END)
+                empty = buffer.find(SHEET_DATA_EMPTY)
+                if end != -1 or empty != -1:
+                    break
+                # Hold back enough bytes to match a marker split across chunks
+                if len(buffer) > keep:
+                    dst.write(buffer[:-keep])
+                    buffer = buffer[-keep:]
+                chunk = src.read(self.CHUNK_SIZE)
+                if not chunk:
+                    raise ValueError(f"No sheetData element found in {info.filename}")
+                buffer += chunk
+
+            if end != -1:
+                dst.write(buffer[:end])
+                shutil.copyfileobj(rows_xml, dst, self.CHUNK_SIZE)
+                dst.write(buffer[end:])
+            else:
+                dst.write(buffer[:empty] + b'<sheetData>')
+                shutil.copyfileobj(rows_xml, dst, self.CHUNK_SIZE)
+                dst.write(b'</sheetData>' + buffer[empty + len(SHEET_DATA_EMPTY):])
+            shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
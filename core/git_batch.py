@@ -0,0 +1,106 @@
+# core/git_batch.py
+
+import atexit
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from config.settings import settings
+
+class GitBatchError(Exception):
+    pass
+
+class GitBatchProcess:
+    """A long-lived `git cat-file --batch` or `--batch-check` process for one repository."""
+
+    def __init__(self, repo_path: str, mode: str) -> None:
+        if mode not in ('--batch', '--batch-check'):
+            raise ValueError(f"Unsupported cat-file mode: {mode}")
+        self.repo_path = Path(repo_path)
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', mode], cwd=self.repo_path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def _request_header(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        if '\n' in rev:
+            raise ValueError(f"Invalid revision: {rev!r}")
+        if self.process.poll() is not None:
+            raise GitBatchError(f"git cat-file {self.mode} exited for {self.repo_path}")
+        self.process.stdin.write(rev.encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise GitBatchError(f"git cat-file {self.mode} closed its output for {self.repo_path}")
+        parts = line.decode('utf-8').split()
+        # "<rev> missing" / "<rev> ambiguous"
+        if len(parts) != 3:
+            return None
+        return parts[0], parts[1], int(parts[2])
+
+    def check(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Return (sha, type, size) for `rev`, or None if it does not resolve."""
+        with self.lock:
+            return self._request_header(rev)
+
+    def read(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (sha, type, content) for `rev`, or None if it does not resolve."""
+        if self.mode != '--batch':
+            raise GitBatchError("Object contents are only available in --batch mode")
+        with self.lock:
+            header = self._request_header(rev)
+            if header is None:
+                return None
+            sha, obj_type, size = header
+            content = self.process.stdout.read(size)
+            self.process.stdout.read(1)  # trailing LF
+            return sha, obj_type, content
+
+    def close(self) -> None:
+        with self.lock:
+            if self.process.poll() is None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.process.kill()
+
+class GitBatchPool:
+    """Keeps at most `max_processes` cat-file processes alive, closing the least recently used."""
+
+    def __init__(self, max_processes: int = 64) -> None:
+        self.max_processes = max_processes
+        self.lock = threading.Lock()
+        self.processes: 'OrderedDict[Tuple[str, str], GitBatchProcess]' = OrderedDict()
+        self.spawned = 0
+
+    def get(self, repo_path: str, mode: str) -> GitBatchProcess:
+        key = (str(Path(repo_path)), mode)
+        evicted = []
+        with self.lock:
+            process = self.processes.get(key)
+            if process is not None and process.process.poll() is None:
+                self.processes.move_to_end(key)
+                return process
+            process = GitBatchProcess(repo_path, mode)
+            self.spawned += 1
+            self.processes[key] = process
+            while len(self.processes) > self.max_processes:
+                _, old = self.processes.popitem(last=False)
+                evicted.append(old)
+        for old in evicted:
+            old.close()
+        return process
+
+    def close_all(self) -> None:
+        with self.lock:
+            processes = list(self.processes.values())
+            self.processes.clear()
+        for process in processes:
+            process.close()
+
+batch_pool = GitBatchPool(settings.git_batch_max_processes)
+atexit.register(batch_pool.close_all)
@@ -1,49 +1,182 @@
+import codecs
 import subprocess
+import threading
+import zlib
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Tuple, Optional, Iterator
+from config.settings import settings
+from core.git_batch import batch_pool, GitBatchError
+from core.ref_snapshot import RefSnapshot, ref_snapshot_cache
+from core.object_store import get_object_store, ObjectStoreError
+
+_spawn_lock = threading.Lock()
+_spawn_count = 0
+_output_bytes = 0
+
+def record_git_spawn() -> None:
+    global _spawn_count
+    with _spawn_lock:
+        _spawn_count += 1
+
+def record_git_output(size: int) -> None:
+    global _output_bytes
+    with _spawn_lock:
+        _output_bytes += size
+
+def get_git_spawn_count() -> int:
+    """Number of git processes started so far, including persistent cat-file workers."""
+    with _spawn_lock:
+        return _spawn_count + batch_pool.spawned
+
+def get_git_output_bytes() -> int:
+    """Bytes read from git output so far (one-off commands, log/format-patch streams and cat-file objects)."""
+    with _spawn_lock:
+        return _output_bytes
 
 class GitHandler:
-    def __init__(self, repo_path: str) -> None:
+    def __init__(self, repo_path: str, backend: Optional[str] = None, log_backend: Optional[str] = None) -> None:
         self.repo_path = Path(repo_path)
+        # 'subprocess' runs one git process per call, 'batch' answers lookups through persistent cat-file processes
+        self.backend = backend or settings.git_backend
+        # 'cli' runs git log, 'objects' walks .git/objects in-process and falls back to git log
+        self.log_backend = log_backend or settings.git_log_backend
+
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        record_git_spawn()
+        result = subprocess.run(cmd, cwd=self.repo_path, **kwargs)
+        if result.stdout:
+            record_git_output(len(result.stdout))
+        return result
+
+    def popen(self, cmd: List[str], **kwargs) -> subprocess.Popen:
+        record_git_spawn()
+        return subprocess.Popen(cmd, cwd=self.repo_path, **kwargs)
+
+    def _batch_check(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        return batch_pool.get(str(self.repo_path), '--batch-check').check(rev)
+
+    def _batch_read(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        obj = batch_pool.get(str(self.repo_path), '--batch').read(rev)
+        if obj is not None:
+            record_git_output(len(obj[2]))
+        return obj
+
+    def rev_parse(self, rev: str) -> str:
+        if self.backend == 'batch':
+            try:
+                header = self._batch_check(rev)
+                return header[0] if header else ''
+            except (GitBatchError, OSError):
+                pass  # Fall back to a one-off git process
+        result = self.run(['git', 'rev-parse', '--verify', '--quiet', rev], stdout=subprocess.PIPE, text=True)
+        return result.stdout.strip()
+
+    def resolve_tag(self, tag: str) -> str:
+        """Commit id a tag points to (peeling annotated tags), or '' if the tag does not exist."""
+        return self.rev_parse(f'refs/tags/{tag}^{{commit}}')
+
+    def get_commit_message(self, commit_id: str) -> str:
+        if self.backend == 'batch':
+            try:
+                obj = self._batch_read(commit_id)
+                if obj is None or obj[1] != 'commit':
+                    return ''
+                _, _, message = obj[2].partition(b'\n\n')
+                return message.decode('utf-8', errors='replace').strip()
+            except (GitBatchError, OSError):
+                pass
+        result = self.run(['git', 'log', '-1', '--format=%B', commit_id], stdout=subprocess.PIPE, text=True)
+        return result.stdout.strip()
+
+    def get_ref_snapshot(self) -> RefSnapshot:
+        """Tag index for this repository, shared across the run and refreshed when tag refs change."""
+        return ref_snapshot_cache.get(self)
 
     def get_last_two_tags(self) -> Tuple[str, str]:
-        cmd = ['git', 'tag', '--sort=-creatordate']
-        result = subprocess.run(cmd, cwd=self.repo_path, stdout=subprocess.PIPE, text=True)
-        tags = result.stdout.strip().split('\n')
+        tags = self.get_ref_snapshot().newest(2)
+        if not tags:
+            return ('', None)
         return (tags[0], tags[1]) if len(tags) >= 2 else (tags[0], None)
 
     def get_latest_commit_id(self) -> str:
-        cmd = ['git', 'rev-parse', 'HEAD']
-        result = subprocess.run(cmd, cwd=self.repo_path, stdout=subprocess.PIPE, text=True)
-        commit_id = result.stdout.strip()
-        return commit_id
+        return self.rev_parse('HEAD')
 
     def get_commit_logs_between_tags(self, old_tag: str, new_tag: str) -> List[Dict[str, str]]:
+        return list(self.iter_commit_logs_between_tags(old_tag, new_tag))
+
+    def iter_commit_logs_between_tags(self, old_tag: str, new_tag: str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, str]]:
+        """Yield commits of `old_tag...new_tag` as `git log` produces them, holding at most one record in memory."""
+        if self.log_backend == 'objects':
+            logs = self._read_commit_logs(old_tag, new_tag)
+            if logs is not None:
+                yield from logs
+                return
         cmd = [
             'git', 'log', f'{old_tag}...{new_tag}',
             '--format=%H%x01%B%x02', '--no-merges'
         ]
-        result = subprocess.run(
-            cmd, cwd=self.repo_path, stdout=subprocess.PIPE, text=True
-        )
-        logs = []
-        entries = result.stdout.strip().split('\x02\n')
-        for entry in entries:
-            if entry:
-                parts = entry.strip().split('\x01', 1)
-                if len(parts) == 2:
-                    commit_id = parts[0]
-                    message = parts[1].strip()
-                    logs.append({'commit_id': commit_id, 'message': message})
-        return logs
+        for record in self._iter_log_records(cmd, chunk_size):
+            log = self._parse_log_record(record)
+            if log is not None:
+                yield log
+
+    def _read_commit_logs(self, old_tag: str, new_tag: str) -> Optional[List[Dict[str, str]]]:
+        # In-process walk over .git/objects; None means "use the git CLI"
+        ref_snapshot = self.get_ref_snapshot()
+        old_commit, new_commit = ref_snapshot.tag_commit(old_tag), ref_snapshot.tag_commit(new_tag)
+        store = get_object_store(self.repo_path) if old_commit and new_commit else None
+        if store is None:
+            return None
+        try:
+            commits = store.symmetric_difference(old_commit, new_commit)
+        except (ObjectStoreError, OSError, ValueError, zlib.error):
+            return None
+        return [
+            {'commit_id': commit_id, 'message': commit.message.strip()}
+            for commit_id, commit in commits
+            if len(commit.parents) <= 1  # --no-merges
+        ]
+
+    def iter_commit_graph(self, tips: List[str], exclude: str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+        """Yield every commit reachable from `tips` but not from `exclude`, merges included, with its parents."""
+        cmd = ['git', 'log', '--format=%H%x01%P%x01%B%x02', *tips, '--not', exclude, '--']
+        for record in self._iter_log_records(cmd, chunk_size):
+            parts = record.strip().split('\x01', 2)
+            if len(parts) == 3:
+                yield {'commit_id': parts[0], 'parents': parts[1].split(), 'message': parts[2].strip()}
+
+    def _iter_log_records(self, cmd: List[str], chunk_size: int) -> Iterator[str]:
+        process = self.popen(cmd, stdout=subprocess.PIPE)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            pending = ''
+            while True:
+                data = process.stdout.read(chunk_size)
+                if not data:
+                    break
+                record_git_output(len(data))
+                pending += decoder.decode(data)
+                # Every record is terminated by \x02; keep the unterminated tail for the next chunk
+                *records, pending = pending.split('\x02')
+                yield from records
+            yield pending + decoder.decode(b'', final=True)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+    @staticmethod
+    def _parse_log_record(record: str) -> Optional[Dict[str, str]]:
+        parts = record.strip().split('\x01', 1)
+        if len(parts) == 2:
+            return {'commit_id': parts[0], 'message': parts[1].strip()}
+        return None
 
     def get_submodule_paths(self) -> List[str]:
         cmd = ['git', 'submodule', 'foreach', '--quiet', 'echo $path']
-        result = subprocess.run(cmd, cwd=self.repo_path, stdout=subprocess.PIPE, text=True, shell=True)
+        result = self.run(cmd, stdout=subprocess.PIPE, text=True, shell=True)
         return result.stdout.strip().split('\n')
 
     def get_all_tags(self) -> List[str]:
-        cmd = ['git', 'tag']
-        result = subprocess.run(cmd, cwd=self.repo_path, stdout=subprocess.PIPE, text=True)
-        tags = result.stdout.strip().split('\n')
-        return tags
\ No newline at end of file
+        return sorted(self.get_ref_snapshot().names)
@@ -1,30 +1,166 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
+import json
+import os
+import threading
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from config.settings import RepositoryConfig
+from config.settings import settings, RepositoryConfig
+
+# Bumped when parsing changes, e.g. v2 picks up projects nested in containers; older entries are dropped
+MANIFEST_CACHE_VERSION = 'v2'
+
+def default_manifest_cache_path() -> str:
+    return settings.manifest_cache_path or str(Path(settings.excel_output_path).with_name('manifest_cache.json'))
+
+class ManifestCache:
+    """Resolved project lists keyed by manifest, valid while every manifest file involved keeps its mtime and size."""
+
+    def __init__(self, cache_path: Optional[str] = None) -> None:
+        self.cache_path = Path(cache_path or default_manifest_cache_path())
+        self.lock = threading.Lock()
+        self.entries: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self.entries is None:
+            try:
+                self.entries = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    @staticmethod
+    def file_stamp(path: str) -> Optional[List[int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        with self.lock:
+            entry = self._load().get(key)
+        if entry is None:
+            return None
+        for path, stamp in entry['files'].items():
+            if self.file_stamp(path) != stamp:
+                return None
+        return entry['projects']
+
+    def put(self, key: str, files: List[str], projects: List[Dict[str, str]]) -> None:
+        """Record `projects` for `key`; `files` starts with the top-level manifest."""
+        with self.lock:
+            entries = self._load()
+            # Prune on save: entries of older parser versions or for manifests that were deleted
+            for stale_key in [stale_key for stale_key, entry in entries.items()
+                              if not stale_key.startswith(MANIFEST_CACHE_VERSION + '|')
+                              or not os.path.exists(next(iter(entry['files']), ''))]:
+                del entries[stale_key]
+            entries[key] = {
+                'files': {path: self.file_stamp(path) for path in files},
+                'projects': projects
+            }
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+                tmp_path.write_text(json.dumps(entries), encoding='utf-8')
+                os.replace(tmp_path, self.cache_path)
+            except OSError:
+                pass  # The cache is an optimisation; parsing still works without it
+
+manifest_cache = ManifestCache()
 
 class ManifestParser:
-    def __init__(self, repo_config: RepositoryConfig) -> None:
+    def __init__(self, repo_config: RepositoryConfig, cache: Optional[ManifestCache] = None,
+                 use_cache: bool = True) -> None:
+        """`cache` defaults to the shared cache when settings.manifest_cache_enabled; use_cache=False always parses."""
         self.repo_config = repo_config
         self.manifest_path = Path(self.repo_config.manifest)
+        if not use_cache:
+            self.cache = None
+        elif cache is not None:
+            self.cache = cache
+        else:
+            self.cache = manifest_cache if settings.manifest_cache_enabled else None
 
     def parse(self) -> List[Dict[str, str]]:
-        tree = ET.parse(self.manifest_path)
-        root = tree.getroot()
+        cache_key = f"{MANIFEST_CACHE_VERSION}|{os.path.abspath(self.manifest_path)}|{os.path.abspath(self.repo_config.path)}"
+        if self.cache is not None:
+            projects = self.cache.get(cache_key)
+            if projects is not None:
+                return projects
+
+        files: List[str] = []
+        declared: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._parse_file(self.manifest_path, declared, files, set())
+        repo_root_path = os.path.abspath(self.repo_config.path)
         projects = []
-        repo_root_path = Path(self.repo_config.path)
-        for project in root.iter('project'):
-            name = project.get('name')
-            path = project.get('path')
-            remote = project.get('remote')
-            remotebranch = project.get('remotebranch')
-            # Resolve the absolute path of the repository
-            absolute_path = (repo_root_path / path).resolve()
-            projects.append({
-                'name': name,
-                'path': path,
-                'absolute_path': str(absolute_path),
-                'remote': remote,
-                'remotebranch': remotebranch
-            })
-        return projects
\ No newline at end of file
+        for project in declared.values():
+            # Lexical join: no filesystem access per project
+            project['absolute_path'] = os.path.normpath(os.path.join(repo_root_path, project['path']))
+            projects.append(project)
+
+        if self.cache is not None:
+            self.cache.put(cache_key, files, projects)
+        return projects
+
+    def _manifests_root(self, manifest_file: Path) -> Optional[Path]:
+        # <include name="..."/> is relative to the manifests checkout (.repo/manifests)
+        for parent in manifest_file.parents:
+            if parent.parent.name == '.repo':
+                return parent
+        return None
+
+    def _resolve_include(self, including_file: Path, name: str) -> Path:
+        candidates = []
+        manifests_root = self._manifests_root(including_file)
+        if manifests_root is not None:
+            candidates.append(manifests_root / name)
+        candidates.append(including_file.parent / name)
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        return candidates[0]
+
+    def _parse_file(self, manifest_file: Path, declared: Dict[Tuple[str, str], Dict[str, str]],
+                    files: List[str], visiting: Set[str]) -> None:
+        file_key = os.path.abspath(manifest_file)
+        if file_key in visiting:
+            raise ValueError(f"Manifest include cycle at {manifest_file}")
+        visiting.add(file_key)
+        files.append(file_key)
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(str(manifest_file), events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = element
+                # Directives may be nested, e.g. jiri manifests group projects under <projects>
+                if depth < 2:
+                    continue
+                if element.tag == 'project':
+                    name = element.get('name')
+                    path = element.get('path') or name
+                    declared.pop((name, path), None)  # Redeclaration keeps the latest position
+                    declared[(name, path)] = {
+                        'name': name,
+                        'path': path,
+                        'remote': element.get('remote'),
+                        'remotebranch': element.get('remotebranch')
+                    }
+                elif element.tag == 'remove-project':
+                    name = element.get('name')
+                    path = element.get('path')
+                    for key in [key for key in declared if key[0] == name and (path is None or key[1] == path)]:
+                        del declared[key]
+                elif element.tag == 'include':
+                    include_name = element.get('name')
+                    if include_name:
+                        self._parse_file(self._resolve_include(manifest_file, include_name), declared, files, visiting)
+            else:
+                depth -= 1
+                if depth == 1 and root is not None:
+                    root.clear()  # Drop processed children to keep memory flat
+                elif element.tag in ('project', 'remove-project', 'include'):
+                    element.clear()  # Inside a container such as <projects>, which is only dropped when it closes
+        visiting.discard(file_key)
@@ -0,0 +1,420 @@
+# core/object_store.py
+
+import atexit
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from config.settings import settings
+from core.ref_snapshot import find_git_dir
+
+OBJ_COMMIT, OBJ_TREE, OBJ_BLOB, OBJ_TAG, OBJ_OFS_DELTA, OBJ_REF_DELTA = 1, 2, 3, 4, 6, 7
+TYPE_NAMES = {OBJ_COMMIT: 'commit', OBJ_TREE: 'tree', OBJ_BLOB: 'blob', OBJ_TAG: 'tag'}
+
+class ObjectStoreError(Exception):
+    pass
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a git pack delta (copy/insert instructions) to `base`."""
+    position = 0
+
+    def read_size() -> int:
+        nonlocal position
+        size = shift = 0
+        while True:
+            byte = delta[position]
+            position += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return size
+
+    if read_size() != len(base):
+        raise ObjectStoreError("Delta base size mismatch")
+    result_size = read_size()
+    result = bytearray()
+    while position < len(delta):
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            offset = size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            result += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            result += delta[position:position + opcode]
+            position += opcode
+        else:
+            raise ObjectStoreError("Invalid delta opcode")
+    if len(result) != result_size:
+        raise ObjectStoreError("Delta result size mismatch")
+    return bytes(result)
+
+class PackFile:
+    """A pack and its version 2 index, both memory-mapped read-only."""
+
+    def __init__(self, index_path: Path) -> None:
+        self.index_path = index_path
+        self.pack_path = index_path.with_suffix('.pack')
+        with index_path.open('rb') as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index[:4] != b'\xfftOc' or struct.unpack('>I', self.index[4:8])[0] != 2:
+            raise ObjectStoreError(f"Unsupported pack index {index_path}")
+        self.fanout = struct.unpack('>256I', self.index[8:8 + 1024])
+        self.count = self.fanout[255]
+        self.names_start = 8 + 1024
+        self.offsets_start = self.names_start + 24 * self.count  # names (20 bytes) and CRCs (4 bytes)
+        self.large_offsets_start = self.offsets_start + 4 * self.count
+        with self.pack_path.open('rb') as f:
+            self.pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.pack[:4] != b'PACK':
+            raise ObjectStoreError(f"Invalid pack {self.pack_path}")
+
+    def close(self) -> None:
+        self.index.close()
+        self.pack.close()
+
+    def find(self, sha: bytes) -> Optional[int]:
+        low = self.fanout[sha[0] - 1] if sha[0] else 0
+        high = self.fanout[sha[0]]
+        while low < high:
+            middle = (low + high) // 2
+            start = self.names_start + 20 * middle
+            name = self.index[start:start + 20]
+            if name < sha:
+                low = middle + 1
+            elif name > sha:
+                high = middle
+            else:
+                offset = struct.unpack('>I', self.index[self.offsets_start + 4 * middle:self.offsets_start + 4 * middle + 4])[0]
+                if offset & 0x80000000:
+                    large = self.large_offsets_start + 8 * (offset & 0x7fffffff)
+                    offset = struct.unpack('>Q', self.index[large:large + 8])[0]
+                return offset
+        return None
+
+    def _inflate(self, position: int, size: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        window = max(size + 64, 4096)
+        result = b''
+        while not decompressor.eof:
+            chunk = self.pack[position:position + window]
+            if not chunk:
+                raise ObjectStoreError(f"Truncated object in {self.pack_path}")
+            result += decompressor.decompress(chunk)
+            position += window
+        if len(result) != size:
+            raise ObjectStoreError(f"Object size mismatch in {self.pack_path}")
+        return result
+
+    def read_at(self, offset: int, store: 'ObjectStore') -> Tuple[int, bytes]:
+        position = offset
+        byte = self.pack[position]
+        position += 1
+        obj_type = (byte >> 4) & 0x7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = self.pack[position]
+            position += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        if obj_type in TYPE_NAMES:
+            return obj_type, self._inflate(position, size)
+        if obj_type == OBJ_OFS_DELTA:
+            byte = self.pack[position]
+            position += 1
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = self.pack[position]
+                position += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+            base_type, base = self.read_at(offset - distance, store)
+        elif obj_type == OBJ_REF_DELTA:
+            base_sha = self.pack[position:position + 20]
+            position += 20
+            base_type, base = store.read_raw(base_sha)
+        else:
+            raise ObjectStoreError(f"Unknown object type {obj_type} in {self.pack_path}")
+        return base_type, apply_delta(base, self._inflate(position, size))
+
+@dataclass
+class CommitRecord:
+    parents: List[str]
+    date: int
+    message: str
+
+class ObjectStore:
+    """Read-only access to one repository's objects: packs via mmap, loose objects via zlib.
+
+    Repositories using features this reader does not follow (SHA-256, grafts,
+    replace refs) are rejected up front so callers can use the git CLI instead.
+    """
+
+    def __init__(self, git_dir: Path) -> None:
+        self.git_dir = git_dir
+        config_path = git_dir / 'config'
+        if config_path.is_file() and 'objectformat' in config_path.read_text(encoding='utf-8', errors='replace').lower():
+            raise ObjectStoreError("Only SHA-1 repositories are supported")
+        if (git_dir / 'info' / 'grafts').exists() or self._has_replace_refs():
+            raise ObjectStoreError("Grafts and replace refs are not supported")
+        self.shallow: Set[str] = set()
+        shallow_file = git_dir / 'shallow'
+        if shallow_file.is_file():
+            self.shallow = set(shallow_file.read_text(encoding='ascii').split())
+        self.object_dirs = self._object_dirs(git_dir / 'objects')
+        self.lock = threading.Lock()
+        self.closed = False
+        self.packs: List[PackFile] = []
+        self.pack_names: Set[str] = set()
+        self._scan_packs()
+        self.commits: Dict[str, CommitRecord] = {}
+
+    def _has_replace_refs(self) -> bool:
+        replace_dir = self.git_dir / 'refs' / 'replace'
+        if replace_dir.is_dir() and any(files for _, _, files in os.walk(replace_dir)):
+            return True
+        packed_refs = self.git_dir / 'packed-refs'
+        return packed_refs.is_file() and b' refs/replace/' in packed_refs.read_bytes()
+
+    @staticmethod
+    def _object_dirs(objects_dir: Path) -> List[Path]:
+        object_dirs = [objects_dir]
+        alternates = objects_dir / 'info' / 'alternates'
+        if alternates.is_file():
+            for line in alternates.read_text(encoding='utf-8').splitlines():
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    object_dirs.append((objects_dir / line).resolve())
+        return object_dirs
+
+    def _scan_packs(self) -> bool:
+        added = False
+        for object_dir in self.object_dirs:
+            pack_dir = object_dir / 'pack'
+            if not pack_dir.is_dir():
+                continue
+            for index_path in sorted(pack_dir.glob('*.idx')):
+                if str(index_path) not in self.pack_names and index_path.with_suffix('.pack').is_file():
+                    self.packs.append(PackFile(index_path))
+                    self.pack_names.add(str(index_path))
+                    added = True
+        return added
+
+    def _read_loose(self, sha_hex: str) -> Optional[Tuple[int, bytes]]:
+        for object_dir in self.object_dirs:
+            try:
+                raw = zlib.decompress((object_dir / sha_hex[:2] / sha_hex[2:]).read_bytes())
+            except FileNotFoundError:
+                continue
+            header, _, content = raw.partition(b'\x00')
+            type_name, _, _ = header.partition(b' ')
+            for obj_type, name in TYPE_NAMES.items():
+                if name.encode('ascii') == type_name:
+                    return obj_type, content
+            raise ObjectStoreError(f"Unknown loose object type {type_name!r}")
+        return None
+
+    def read_raw(self, sha: bytes) -> Tuple[int, bytes]:
+        for pack in self.packs:
+            offset = pack.find(sha)
+            if offset is not None:
+                return pack.read_at(offset, self)
+        loose = self._read_loose(sha.hex())
+        if loose is not None:
+            return loose
+        # A repack or fetch may have added packs since the store was opened
+        with self.lock:
+            rescanned = not self.closed and self._scan_packs()
+        if rescanned:
+            return self.read_raw(sha)
+        raise ObjectStoreError(f"Object {sha.hex()} not found")
+
+    def read(self, sha_hex: str) -> Tuple[str, bytes]:
+        obj_type, content = self.read_raw(bytes.fromhex(sha_hex))
+        return TYPE_NAMES[obj_type], content
+
+    def commit(self, sha_hex: str) -> CommitRecord:
+        record = self.commits.get(sha_hex)
+        if record is not None:
+            return record
+        obj_type, content = self.read(sha_hex)
+        if obj_type != 'commit':
+            raise ObjectStoreError(f"{sha_hex} is a {obj_type}, not a commit")
+        headers, _, body = content.partition(b'\n\n')
+        parents: List[str] = []
+        date = 0
+        encoding = 'utf-8'
+        for line in headers.split(b'\n'):
+            if line.startswith(b'parent '):
+                parents.append(line[7:].decode('ascii'))
+            elif line.startswith(b'committer '):
+                try:
+                    date = int(line.rsplit(b' ', 2)[1])
+                except (IndexError, ValueError):
+                    date = 0
+            elif line.startswith(b'encoding '):
+                encoding = line[9:].decode('ascii', errors='replace').strip()
+        if sha_hex in self.shallow:
+            parents = []
+        try:
+            message = body.decode(encoding, errors='replace')
+        except LookupError:
+            message = body.decode('utf-8', errors='replace')
+        record = CommitRecord(parents=parents, date=date, message=message)
+        self.commits[sha_hex] = record
+        return record
+
+    def close(self) -> None:
+        """Unmap the packs and drop parsed commits; later reads fail (ObjectStoreError, or ValueError mid-read)."""
+        with self.lock:
+            self.closed = True
+            for pack in self.packs:
+                pack.close()
+            self.packs = []
+            self.pack_names.clear()
+            self.commits = {}
+
+    def symmetric_difference(self, left: str, right: str) -> List[Tuple[str, CommitRecord]]:
+        """Commits reachable from exactly one of `left` and `right`, newest first as `git log left...right` lists them.
+
+        Both sides are painted down in commit-date order, the way git finds merge
+        bases. A commit popped with one side's flag can still be reached from the
+        other side through a later-popping descendant (equal dates), so the walk goes
+        on while any queued commit is as new as the oldest such commit. That is exact
+        while no parent is newer than its child; on clock skew ObjectStoreError is
+        raised so the caller can use `git log` instead.
+        """
+        LEFT, RIGHT, BOTH = 1, 2, 3
+        flags: Dict[str, int] = {}
+        queue: List[Tuple[int, int, str]] = []
+        counter = itertools.count()
+        order: List[str] = []
+        popped: Set[str] = set()
+        # Queue entries per commit, and entries whose commit is not yet BOTH (git's still_interesting)
+        queued: Dict[str, int] = {}
+        interesting = 0
+        # Popped commits still reachable from one side only, oldest first (stale entries are skipped lazily)
+        one_sided: List[Tuple[int, str]] = []
+        # Kept here rather than read back from self.commits, which close() may clear mid-walk
+        records: Dict[str, CommitRecord] = {}
+
+        def load(sha: str) -> CommitRecord:
+            record = records.get(sha)
+            if record is None:
+                record = records[sha] = self.commit(sha)
+                # Checked as commits are queued, so the stop test below can rely on it
+                for parent in record.parents:
+                    if self.commit(parent).date > record.date:
+                        raise ObjectStoreError(f"Clock skew between {sha} and its parent {parent}")
+            return record
+
+        def paint(sha: str, flag: int) -> None:
+            nonlocal interesting
+            stack = [(sha, flag)]
+            while stack:
+                sha, flag = stack.pop()
+                current = flags.get(sha, 0)
+                if current | flag == current:
+                    continue
+                flags[sha] = current | flag
+                if flags[sha] == BOTH:
+                    # Entries queued earlier were counted while one-sided
+                    interesting -= queued.get(sha, 0)
+                if sha in popped:
+                    # Already expanded: push the new flag straight down its known ancestry,
+                    # as git's mark_parents_uninteresting does, rather than waiting for its turn
+                    stack.extend((parent, flags[sha]) for parent in records[sha].parents)
+                    continue
+                if flags[sha] != BOTH:
+                    interesting += 1
+                queued[sha] = queued.get(sha, 0) + 1
+                heapq.heappush(queue, (-load(sha).date, next(counter), sha))
+
+        def may_reach_one_sided() -> bool:
+            while one_sided and flags[one_sided[0][1]] == BOTH:
+                heapq.heappop(one_sided)
+            # Without skew a descendant is never older than its ancestors
+            return bool(one_sided) and -queue[0][0] >= one_sided[0][0]
+
+        paint(left, LEFT)
+        paint(right, RIGHT)
+        while queue and (interesting or may_reach_one_sided()):
+            _, _, sha = heapq.heappop(queue)
+            queued[sha] -= 1
+            if flags[sha] != BOTH:
+                interesting -= 1
+            if sha not in popped:
+                popped.add(sha)
+                order.append(sha)
+            if flags[sha] != BOTH:
+                heapq.heappush(one_sided, (records[sha].date, sha))
+            for parent in records[sha].parents:
+                paint(parent, flags[sha])
+        return [(sha, records[sha]) for sha in order if flags[sha] != BOTH]
+
+class ObjectStorePool:
+    """Keeps at most `max_stores` repositories' object stores open, closing the least recently used."""
+
+    def __init__(self, max_stores: int = 64) -> None:
+        self.max_stores = max_stores
+        self.lock = threading.Lock()
+        # None marks a repository that cannot be read in-process
+        self.stores: 'OrderedDict[str, Optional[ObjectStore]]' = OrderedDict()
+
+    def get(self, repo_path: Path) -> Optional[ObjectStore]:
+        key = str(repo_path)
+        with self.lock:
+            if key in self.stores:
+                self.stores.move_to_end(key)
+                return self.stores[key]
+        git_dir = find_git_dir(repo_path)
+        store = None
+        if git_dir is not None:
+            try:
+                store = ObjectStore(git_dir)
+            except (ObjectStoreError, OSError, ValueError):
+                store = None
+        evicted = []
+        with self.lock:
+            if key in self.stores:
+                # Opened by another thread meanwhile
+                evicted.append(store)
+                store = self.stores[key]
+            else:
+                self.stores[key] = store
+                while len(self.stores) > max(1, self.max_stores):
+                    _, old = self.stores.popitem(last=False)
+                    evicted.append(old)
+        for old in evicted:
+            if old is not None:
+                old.close()
+        return store
+
+    def close_all(self) -> None:
+        with self.lock:
+            stores = list(self.stores.values())
+            self.stores.clear()
+        for store in stores:
+            if store is not None:
+                store.close()
+
+store_pool = ObjectStorePool(settings.object_store_max_open)
+atexit.register(store_pool.close_all)
+
+def get_object_store(repo_path: Path) -> Optional[ObjectStore]:
+    """Shared ObjectStore for a repository, or None when it cannot be read in-process."""
+    return store_pool.get(repo_path)
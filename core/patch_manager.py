@@ -1,22 +1,221 @@
+import re
+import shutil
 import subprocess
-from typing import List, Dict
+from email.header import decode_header, make_header
+from typing import IO, Callable, List, Dict, Optional, Tuple
 from pathlib import Path
-from core.git_handler import GitHandler
+from config.settings import settings
+from core.git_handler import GitHandler, record_git_output
+from core.patch_store import PatchStore, PatchIdBatch
+
+# First line of every patch in `git format-patch` output
+PATCH_START_RE = re.compile(rb'^From ([0-9a-f]{40,64}) Mon Sep 17 00:00:00 2001\n$')
+PATCH_PREFIX_RE = re.compile(r'^\[PATCH[^\]]*\]\s*')
+# Same limit git applies to generated file names (format.filenameMaxLength)
+PATCH_NAME_MAX = 64
+
+def sanitize_patch_subject(subject: str) -> str:
+    """Mirror git's format_sanitized_subject: keep [A-Za-z0-9._], collapse everything else to '-'."""
+    result = []
+    space = 2
+    previous_dot = False
+    for char in subject:
+        if char.isascii() and (char.isalnum() or char in '._'):
+            if char == '.' and previous_dot:
+                continue
+            if space == 1:
+                result.append('-')
+            space = 0
+            result.append(char)
+            previous_dot = char == '.'
+        else:
+            space |= 1
+            previous_dot = False
+    return ''.join(result).rstrip('.-')
+
+def file_name_subject(message: str) -> str:
+    """The part of a commit message git names patch files after: its first non-blank line."""
+    for line in message.split('\n'):
+        if line.strip():
+            return line
+    return ''
 
 class PatchManager:
-    def __init__(self, repo_path: str, old_tag: str, new_tag: str) -> None:
+    def __init__(self, repo_path: str, old_tag: str, new_tag: str, patch_store: Optional[PatchStore] = None) -> None:
         self.git_handler = GitHandler(repo_path)
         self.old_tag = old_tag
         self.new_tag = new_tag
+        # With a store, patches are filed under their patch id and the run directories only get diff-less ones
+        self.patch_store = patch_store
+        self.patches_stored = 0
+        self.patches_deduplicated = 0
 
     def generate_patches(self, output_dir: str) -> List[Path]:
-        cmd = [
-            'git', 'format-patch', f'{self.old_tag}...{self.new_tag}', 
-            '--output-directory', output_dir
-        ]
-        subprocess.run(cmd, cwd=self.git_handler.repo_path)
-        patch_files = list(Path(output_dir).glob('*.patch'))
-        return patch_files
+        return list(self.generate_patch_map(output_dir).values())
+
+    def generate_patch_map(self, output_dir: str, messages: Optional[Dict[str, str]] = None) -> Dict[str, Path]:
+        """Write one patch per commit into `output_dir` and return commit id -> patch path.
+
+        `git format-patch --stdout` is split on its "From <sha>" separators while it
+        streams, so the mapping comes from generation itself; nothing in `output_dir`
+        is listed or read back. File names come from `messages` (commit id -> message)
+        when given: git uses only the first line of a multi-line subject, while the
+        Subject header, used otherwise, joins the whole first paragraph.
+        """
+        output_path = Path(output_dir)
+        if self.patch_store is None:
+            output_path.mkdir(parents=True, exist_ok=True)
+
+        def target(commit_id: str, ordinal: int) -> Tuple[Path, int]:
+            return output_path, ordinal
+
+        return self._split_patches([f'{self.old_tag}...{self.new_tag}'], target, messages)
+
+    def generate_interval_patch_map(self, tips: List[str], targets: Dict[str, Tuple[Path, int]],
+                                    messages: Optional[Dict[str, str]] = None) -> Dict[str, Path]:
+        """One `format-patch` over every tip in `tips` not reachable from `old_tag`.
+
+        `targets` maps commit id -> (directory, patch number); commits missing from it
+        are not written. Used to split several consecutive releases in one walk.
+        """
+        if self.patch_store is None:
+            for directory, _ in targets.values():
+                directory.mkdir(parents=True, exist_ok=True)
+        return self._split_patches([*tips, '--not', self.old_tag], lambda commit_id, _: targets.get(commit_id), messages)
+
+    def _split_patches(self, revisions: List[str], target: Callable[[str, int], Optional[Tuple[Path, int]]],
+                       messages: Optional[Dict[str, str]]) -> Dict[str, Path]:
+        cmd = ['git', 'format-patch', '--stdout', *revisions]
+        process = self.git_handler.popen(cmd, stdout=subprocess.PIPE)
+        patch_ids = PatchIdBatch(self.git_handler) if self.patch_store is not None else None
+        patch_map: Dict[str, Path] = {}
+        # Store mode: spooled patches waiting for their patch id
+        pending: List[Tuple[str, Path, IO[bytes]]] = []
+        current: Optional[IO[bytes]] = None
+        header: List[bytes] = []
+        held_line = b''
+        commit_id = ''
+        ordinal = 0
+        output_bytes = 0
+        try:
+            for line in process.stdout:
+                output_bytes += len(line)
+                match = PATCH_START_RE.match(line)
+                if match and current is not None:
+                    # --stdout separates patches with one blank line that files do not have
+                    if held_line not in (b'\n', b''):
+                        current.write(held_line)
+                    if patch_ids is None:
+                        current.close()
+                    current = None
+                if match and patch_ids is not None:
+                    patch_ids = self._file_pending(pending, patch_ids, patch_map)
+                if patch_ids is not None:
+                    patch_ids.feed(line)
+                if match:
+                    held_line = b''
+                    commit_id = match.group(1).decode('ascii')
+                    ordinal += 1
+                    header = [line]
+                    continue
+                if current is None and header:
+                    header.append(line)
+                    # The patch file name needs the subject, which ends with the mail headers
+                    if line in (b'\n', b'\r\n'):
+                        destination = target(commit_id, ordinal)
+                        if destination is not None:
+                            subject = file_name_subject(messages[commit_id]) if messages and commit_id in messages else None
+                            patch_file = destination[0] / self._patch_file_name(destination[1], header, subject)
+                            if patch_ids is None:
+                                current = patch_file.open('wb')
+                            else:
+                                current = self.patch_store.spool()
+                                pending.append((commit_id, patch_file, current))
+                            current.writelines(header)
+                            patch_map[commit_id] = patch_file
+                        header = []
+                    continue
+                if current is not None:
+                    current.write(held_line)
+                    held_line = line
+        finally:
+            if current is not None:
+                current.write(held_line)
+                if patch_ids is None:
+                    current.close()
+            process.stdout.close()
+            process.wait()
+            record_git_output(output_bytes)
+            ids = patch_ids.finish() if patch_ids is not None else {}
+        if patch_ids is not None:
+            patch_map.update(self._file_spooled(pending, ids))
+        return patch_map
+
+    def _file_pending(self, pending: List[Tuple[str, Path, IO[bytes]]], patch_ids: PatchIdBatch,
+                      patch_map: Dict[str, Path]) -> PatchIdBatch:
+        """File the complete patches in `pending` whose ids are known and return the batch to feed next.
+
+        With settings.patch_store_max_pending patches waiting, the batch is finished, which
+        flushes every id, and a new one is started, so only that many stay spooled.
+        """
+        if len(pending) >= settings.patch_store_max_pending:
+            patch_map.update(self._file_spooled(pending, patch_ids.finish()))
+            pending.clear()
+            return PatchIdBatch(self.git_handler)
+        ready = patch_ids.ready()
+        # Ids come in input order, so patches queued before one that has an id have no diff
+        answered = max((index + 1 for index, (commit_id, _, _) in enumerate(pending) if commit_id in ready), default=0)
+        if answered:
+            patch_map.update(self._file_spooled(pending[:answered], ready))
+            del pending[:answered]
+        return patch_ids
+
+    def _file_spooled(self, spooled: List[Tuple[str, Path, IO[bytes]]], patch_ids: Dict[str, str]) -> Dict[str, Path]:
+        filed: Dict[str, Path] = {}
+        for commit_id, patch_file, content in spooled:
+            patch_id = patch_ids.get(commit_id)
+            if patch_id is None:
+                # Nothing to key on (e.g. an empty commit); keep it in the run directory
+                patch_file.parent.mkdir(parents=True, exist_ok=True)
+                content.seek(0)
+                with patch_file.open('wb') as f:
+                    shutil.copyfileobj(content, f)
+                filed[commit_id] = patch_file
+            else:
+                if self.patch_store.add(patch_id, content):
+                    self.patches_stored += 1
+                else:
+                    self.patches_deduplicated += 1
+                filed[commit_id] = self.patch_store.path_for(patch_id)
+            content.close()
+        return filed
+
+    @staticmethod
+    def _patch_file_name(number: int, header: List[bytes], subject: Optional[str] = None) -> str:
+        if subject is None:
+            subject = PatchManager._header_subject(header)
+        suffix = '.patch'
+        name = f'{number:04d}-{sanitize_patch_subject(subject)}'
+        return name[:PATCH_NAME_MAX - len(suffix) - 1] + suffix
+
+    @staticmethod
+    def _header_subject(header: List[bytes]) -> str:
+        subject = ''
+        in_subject = False
+        for raw_line in header:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\r\n')
+            if line.startswith('Subject:'):
+                subject = line[len('Subject:'):].strip()
+                in_subject = True
+            elif in_subject and line[:1] in (' ', '\t'):
+                subject += line  # Folded header continuation
+            else:
+                in_subject = False
+        try:
+            subject = str(make_header(decode_header(subject)))
+        except (ValueError, LookupError):
+            pass
+        return PATCH_PREFIX_RE.sub('', subject)
 
     @staticmethod
     def extract_commit_id_from_patch(patch_file_path: Path) -> str:
@@ -0,0 +1,94 @@
+# core/patch_store.py
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import IO, Dict, Optional
+from config.settings import settings
+from core.git_handler import GitHandler
+
+def default_patch_store_dir() -> str:
+    return settings.patch_store_dir or str(Path(settings.patch_output_dir) / 'store')
+
+class PatchIdBatch:
+    """One `git patch-id --stable` process fed consecutive patches of a format-patch stream."""
+
+    def __init__(self, git_handler: GitHandler) -> None:
+        self.process = git_handler.popen(['git', 'patch-id', '--stable'], stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.patch_ids: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.failed = False
+        # Drain output concurrently so a long range cannot fill the pipe and stall the writer
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            parts = line.split()
+            if len(parts) == 2:
+                with self.lock:
+                    self.patch_ids[parts[1].decode('ascii')] = parts[0].decode('ascii')
+
+    def ready(self) -> Dict[str, str]:
+        """Ids received so far; git answers in input order but buffers its output, so they arrive in blocks."""
+        if self.failed:
+            return {}
+        with self.lock:
+            return dict(self.patch_ids)
+
+    def feed(self, data: bytes) -> None:
+        if self.failed:
+            return
+        try:
+            self.process.stdin.write(data)
+        except OSError:
+            # Without ids the patches are kept in the run directory instead
+            self.failed = True
+
+    def finish(self) -> Dict[str, str]:
+        """commit id -> patch id; commits without a diff have no entry."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.reader.join()
+        self.process.stdout.close()
+        self.process.wait()
+        # A partly fed stream could give the last patch a wrong id
+        return {} if self.failed else self.patch_ids
+
+class PatchStore:
+    """Patch files addressed by `git patch-id --stable`, shared by every repository and run.
+
+    A change cherry-picked into several projects has one patch id and so one file;
+    the first copy written is kept.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = Path(root or default_patch_store_dir())
+
+    def path_for(self, patch_id: str) -> Path:
+        return self.root / patch_id[:2] / f'{patch_id}.patch'
+
+    def add(self, patch_id: str, content: IO[bytes]) -> bool:
+        """Store `content` under `patch_id` unless an entry exists; return whether anything was written."""
+        path = self.path_for(patch_id)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent writers of the same id produce identical files; the rename keeps readers from seeing a partial one
+        tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}')
+        content.seek(0)
+        with tmp_path.open('wb') as f:
+            shutil.copyfileobj(content, f)
+        os.replace(tmp_path, path)
+        return True
+
+    def spool(self) -> IO[bytes]:
+        # Patches stay in memory until their id is known; only very large ones reach disk early
+        return tempfile.SpooledTemporaryFile(max_size=settings.patch_store_spool_size)
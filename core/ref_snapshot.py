@@ -0,0 +1,128 @@
+# core/ref_snapshot.py
+
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.git_handler import GitHandler
+
+# name, tag object/commit, peeled commit (annotated tags only), creator date
+FOR_EACH_REF_FORMAT = '%(refname:strip=2)%00%(objectname)%00%(*objectname)%00%(creatordate:unix)'
+
+@dataclass
+class TagRef:
+    name: str
+    commit_id: str
+    created: int
+
+@dataclass
+class RefSnapshot:
+    """All tags of one repository, read in a single `git for-each-ref` call."""
+    tags: List[TagRef] = field(default_factory=list)  # Newest first, same order as `git tag --sort=-creatordate`
+
+    def __post_init__(self) -> None:
+        self.by_name: Dict[str, TagRef] = {tag.name: tag for tag in self.tags}
+        self.names: Set[str] = set(self.by_name)
+
+    def has_tag(self, name: str) -> bool:
+        return name in self.names
+
+    def tag_commit(self, name: str) -> Optional[str]:
+        tag = self.by_name.get(name)
+        return tag.commit_id if tag else None
+
+    def newest(self, count: int) -> List[str]:
+        return [tag.name for tag in self.tags[:count]]
+
+    def tag_before(self, name: str, prefix: str = '') -> Optional[str]:
+        """The next older tag starting with `prefix`, or None when `name` is missing or the oldest."""
+        names = [tag.name for tag in self.tags if tag.name.startswith(prefix)]
+        if name not in names:
+            return None
+        index = names.index(name)
+        return names[index + 1] if index + 1 < len(names) else None
+
+    @classmethod
+    def parse(cls, output: str) -> 'RefSnapshot':
+        tags = []
+        for line in output.splitlines():
+            parts = line.split('\x00')
+            if len(parts) != 4 or not parts[0]:
+                continue
+            name, object_id, peeled_id, created = parts
+            tags.append(TagRef(name=name, commit_id=peeled_id or object_id, created=int(created or 0)))
+        return cls(tags=tags)
+
+def find_git_dir(repo_path: Path) -> Optional[Path]:
+    """Locate the common git directory without spawning git (handles gitfiles and worktrees)."""
+    dot_git = repo_path / '.git'
+    if dot_git.is_dir():
+        git_dir = dot_git
+    elif dot_git.is_file():
+        content = dot_git.read_text(encoding='utf-8', errors='replace').strip()
+        if not content.startswith('gitdir:'):
+            return None
+        git_dir = (repo_path / content[len('gitdir:'):].strip()).resolve()
+    else:
+        return None
+    commondir_file = git_dir / 'commondir'
+    if commondir_file.is_file():
+        git_dir = (git_dir / commondir_file.read_text(encoding='utf-8').strip()).resolve()
+    return git_dir
+
+def refs_stamp(git_dir: Optional[Path]) -> Optional[Tuple]:
+    """Cheap fingerprint of packed-refs and the loose refs/tags tree; changes when any tag is added, moved or removed."""
+    if git_dir is None:
+        return None
+    stamp: List[Tuple] = []
+    try:
+        packed = (git_dir / 'packed-refs').stat()
+        stamp.append(('packed-refs', packed.st_mtime_ns, packed.st_size))
+    except OSError:
+        stamp.append(('packed-refs', None))
+    tags_dir = git_dir / 'refs' / 'tags'
+    for dir_path, _, _ in os.walk(tags_dir, followlinks=True):
+        try:
+            stamp.append((dir_path, os.stat(dir_path).st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(stamp)
+
+class RefSnapshotCache:
+    """Run-wide cache of RefSnapshot per repository, invalidated when the repository's tag refs change."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[Optional[Tuple], RefSnapshot]] = {}
+        self.git_dirs: Dict[str, Optional[Path]] = {}
+
+    def get(self, git_handler: 'GitHandler') -> RefSnapshot:
+        key = str(git_handler.repo_path)
+        with self.lock:
+            if key not in self.git_dirs:
+                self.git_dirs[key] = find_git_dir(git_handler.repo_path)
+            git_dir = self.git_dirs[key]
+            cached = self.entries.get(key)
+        stamp = refs_stamp(git_dir)
+        # Without a git dir there is nothing to watch, so the snapshot is kept for the whole run
+        if cached is not None and (stamp is None or cached[0] == stamp):
+            return cached[1]
+        result = git_handler.run(
+            ['git', 'for-each-ref', '--sort=-creatordate', f'--format={FOR_EACH_REF_FORMAT}', 'refs/tags'],
+            stdout=subprocess.PIPE, text=True
+        )
+        snapshot = RefSnapshot.parse(result.stdout)
+        with self.lock:
+            self.entries[key] = (stamp, snapshot)
+        return snapshot
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.git_dirs.clear()
+
+ref_snapshot_cache = RefSnapshotCache()
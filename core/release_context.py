@@ -0,0 +1,49 @@
+# core/release_context.py
+
+from dataclasses import dataclass
+from typing import Optional
+import os
+from config.settings import settings
+from core.git_handler import GitHandler
+from utils.logger import get_logger
+
+@dataclass
+class ReleaseContext:
+    """Run-wide column values, resolved once per run and shared by every output row."""
+    latest_git_tag: str = ''  # Column A
+    specific_repo_last_commits: str = ''  # Column F
+
+    @classmethod
+    def resolve(cls, latest_git_tag: Optional[str] = None) -> 'ReleaseContext':
+        logger = get_logger('ReleaseContext')
+        if latest_git_tag is None:
+            latest_git_tag = cls._get_grt_latest_tag()
+        logger.debug("Latest GRT tag: %s", latest_git_tag)
+        return cls(
+            latest_git_tag=latest_git_tag,
+            specific_repo_last_commits=cls._get_specific_repo_last_commits()
+        )
+
+    @staticmethod
+    def _get_grt_latest_tag() -> str:
+        # Assuming grt repository is configured
+        grt_repo = next((repo for repo in settings.repositories if repo.name == 'grt'), None)
+        if grt_repo:
+            latest_tag, _ = GitHandler(grt_repo.path).get_last_two_tags()
+            return latest_tag
+        return ''
+
+    @staticmethod
+    def _get_specific_repo_last_commits() -> str:
+        logger = get_logger('ReleaseContext')
+        last_commits = []
+        for repo_path in settings.specific_commit_repos:
+            try:
+                last_commit_id = GitHandler(repo_path).get_latest_commit_id()
+                relative_path = os.path.relpath(repo_path, settings.specific_commit_base_path)
+                last_commits.append(f"{relative_path}: {last_commit_id}")
+                logger.debug("Last commit for %s: %s", relative_path, last_commit_id)
+            except Exception as e:
+                logger.error(f"Error retrieving latest commit for {repo_path}: {e}")
+                continue  # Skip this repository and continue with the next one
+        return '\n'.join(last_commits)
@@ -1,10 +1,336 @@
-from typing import List
+# core/release_note_writer.py
+
+import abc
+import csv
+import datetime
+import json
+import sqlite3
+import time
 from pathlib import Path
+from typing import Any, Iterable, List, Optional, Iterator, Tuple
+from config.settings import settings, RepositoryInfo, CommitInfo
+from core.release_context import ReleaseContext
+from core.commit_index import CommitIndex
+from utils.logger import get_logger, verbose_console
+from rich.console import Console
+
+# The 15-column row model (A..O) shared by every output format
+COLUMN_HEADERS = [
+    'Latest Git TAG',  # Column A
+    'Commit Message',  # Column B
+    'Parent Repository',  # Column C
+    'Patch File',  # Column D
+    'Topic Content',  # Column E
+    'Specific Repos Last Commit IDs',  # Column F
+    'Responsible Persons',  # Column G
+    'Submission Time',  # Column H
+    'Needs Porting',  # Column I
+    'Porting Done',  # Column J
+    'Send to Customer',  # Column K
+    '',  # Column L (blank)
+    '',  # Column M (blank)
+    '',  # Column N (blank)
+    'Commit ID'  # Column O
+]
+# Field names for formats with named fields (JSONL keys, SQLite columns)
+COLUMN_KEYS = [
+    'latest_git_tag', 'commit_message', 'parent_repository', 'patch_file', 'topic_content',
+    'specific_repos_last_commit_ids', 'responsible_persons', 'submission_time', 'needs_porting',
+    'porting_done', 'send_to_customer', 'column_l', 'column_m', 'column_n', 'commit_id'
+]
+COMMIT_ID_COLUMN = COLUMN_KEYS.index('commit_id')
+PARENT_REPOSITORY_COLUMN = COLUMN_KEYS.index('parent_repository')
+
+class ReleaseNoteWriter(abc.ABC):
+    """Builds one row per commit and streams the rows to an output, one at a time.
+
+    Subclasses implement `_write_rows`; rows are produced lazily, so no backend
+    needs the whole release in memory. Rows for commits the output already holds
+    are dropped (or collected in `pending_updates` for backends that can update
+    rows in place) using a CommitIndex kept next to the output.
+    """
 
-class ReleaseNoteWriter:
-    def __init__(self, output_path: str) -> None:
+    # Whether _write_rows applies pending_updates to existing rows
+    supports_update = False
+
+    def __init__(self, output_path: str, release_context: Optional[ReleaseContext] = None) -> None:
         self.output_path = Path(output_path)
+        # Run-wide columns; resolved lazily on the first write when not handed in
+        self.release_context = release_context
+        self.logger = get_logger(type(self).__name__)
+        self.console = Console()
+        self.verbose = verbose_console()
+        # Time spent writing the output in the last write call
+        self.save_seconds: Optional[float] = None
+        # Rows of the last write whose commit was already in the output (see settings.duplicate_commits)
+        self.rows_skipped = 0
+        self.pending_updates: List[List[Any]] = []
 
     def write(self, content: str) -> None:
         with self.output_path.open('w', encoding='utf-8') as f:
-            f.write(content)
\ No newline at end of file
+            f.write(content)
+
+    def write_commits(self, repositories: List[RepositoryInfo]) -> None:
+        if self.release_context is None:
+            self.release_context = ReleaseContext.resolve()
+        self.write_releases([(self.release_context, repositories)])
+
+    def write_releases(self, releases: List[Tuple[ReleaseContext, List[RepositoryInfo]]]) -> None:
+        """Write the rows of several releases, each with its own run-wide columns, in a single pass."""
+        self.write_rows(row for context, repositories in releases for row in self._iter_rows(repositories, context))
+
+    def write_rows(self, rows: Iterable[List[Any]]) -> int:
+        """Stream prepared rows (columns A..O) to the output; returns the number written."""
+        self.save_seconds = None
+        self.rows_skipped = 0
+        self.pending_updates = []
+        start = time.perf_counter()
+        try:
+            commit_index = None
+            if settings.duplicate_commits != 'append':
+                commit_index = CommitIndex.load(self.output_path, self._existing_commit_ids)
+                rows = self._filter_duplicates(rows, commit_index)
+            row_count = self._write_rows(iter(rows))
+            if commit_index is not None:
+                commit_index.save()
+        except Exception as e:
+            error_message = f"Error writing {self.output_path}: {e}"
+            self.logger.error(error_message)
+            self.console.log(f"[red]{error_message}[/red]")
+            return 0
+        if self.save_seconds is None:
+            self.save_seconds = time.perf_counter() - start
+        message = self._written_message(row_count)
+        if self.rows_skipped or self.pending_updates:
+            message += f" ({len(self.pending_updates)} existing commits updated, {self.rows_skipped} skipped)"
+        if self.rows_skipped and settings.duplicate_commits == 'update':
+            self.logger.warning(f"{type(self).__name__} cannot update rows in place; existing commits were skipped")
+        self.logger.info(message)
+        self.console.log(f"[green]{message}[/green]")
+        return row_count
+
+    def _filter_duplicates(self, rows: Iterable[List[Any]], commit_index: CommitIndex) -> Iterator[List[Any]]:
+        # Only commits that were in the output before this write count: one run may list a commit
+        # under several repositories (projects shared by manifests), and each gets its row
+        update = settings.duplicate_commits == 'update' and self.supports_update
+        written_ids = []
+        for row_data in rows:
+            commit_id = row_data[COMMIT_ID_COLUMN]
+            if commit_id in commit_index:
+                if update:
+                    # Applied by the backend once the new rows are written
+                    self.pending_updates.append(row_data)
+                else:
+                    self.rows_skipped += 1
+                continue
+            written_ids.append(commit_id)
+            yield row_data
+        for commit_id in written_ids:
+            commit_index.add(commit_id)
+
+    def _existing_commit_ids(self) -> Iterator[str]:
+        for row_data in read_release_rows(str(self.output_path)):
+            yield row_data[COMMIT_ID_COLUMN]
+
+    @abc.abstractmethod
+    def _write_rows(self, rows: Iterator[List[Any]]) -> int:
+        """Write `rows` to the output and return how many were written."""
+
+    def _written_message(self, row_count: int) -> str:
+        return f"Wrote {row_count} rows to {self.output_path}"
+
+    def _sanitize_row(self, row_data: List[Any]) -> List[Any]:
+        return row_data
+
+    def _iter_rows(self, repositories: List[RepositoryInfo], context: ReleaseContext) -> Iterator[List[Any]]:
+        for repo in repositories:
+            for commit in repo.commits:
+                try:
+                    row_data = self._sanitize_row(self._prepare_row_data(repo, commit, context))
+                except Exception as e:
+                    error_message = f"Error writing commit {commit.commit_id} to {self.output_path.name}: {e}"
+                    self.logger.error(error_message)
+                    self.console.log(f"[red]{error_message}[/red]")
+                    continue  # Skip this commit and continue with the next one
+                yield row_data
+                self.logger.debug("Written commit %s to %s", commit.commit_id, self.output_path.name)
+                if self.verbose:
+                    self.console.log(f"[cyan]Written commit {commit.commit_id} to {self.output_path.name}[/cyan]")
+
+    def _prepare_row_data(self, repo: RepositoryInfo, commit: CommitInfo, context: ReleaseContext) -> List[Any]:
+        # Column A: Latest Git TAG from /home/nebula/grt
+        latest_git_tag = context.latest_git_tag
+        # Column B: Commit Message
+        commit_message = commit.message
+        # Column C: Parent Repository Name (based on commit's parent_repos)
+        parent_repo_names = '\n'.join(commit.parent_repos) if commit.parent_repos else self._get_parent_repo_name(repo)
+        # Column D: Patch File Path
+        patch_file = commit.patch_file or ''
+        # Column E: Topic Related Content (configurable)
+        topic_content = self._get_topic_content(commit)
+        # Column F: Last Commit IDs from specific repositories
+        last_commit_ids = context.specific_repo_last_commits
+        # Column G: Responsible Persons (configurable)
+        responsible_persons = settings.responsible_person_info
+        # Column H: Submission Time (configurable)
+        submission_time = self._get_submission_time(commit)
+        # Column I: Needs Porting (configurable)
+        needs_porting = settings.porting_status_options.get('needs_porting', '')
+        # Column J: Porting Done (configurable)
+        porting_done = settings.porting_status_options.get('porting_done', '')
+        # Column K: Send to Customer (configurable)
+        send_to_customer = settings.porting_status_options.get('send_to_customer', '')
+        # Column O: Commit ID
+        commit_id = commit.commit_id
+
+        row_data = [
+            latest_git_tag,         # Column A
+            commit_message,         # Column B
+            parent_repo_names,      # Column C
+            patch_file,             # Column D
+            topic_content,          # Column E
+            last_commit_ids,        # Column F
+            responsible_persons,    # Column G
+            submission_time,        # Column H
+            needs_porting,          # Column I
+            porting_done,           # Column J
+            send_to_customer,       # Column K
+            '',                     # Column L
+            '',                     # Column M
+            '',                     # Column N
+            commit_id               # Column O
+        ]
+
+        return row_data
+
+    def _get_parent_repo_name(self, repo: RepositoryInfo) -> str:
+        if repo.parent:
+            mapped_name = settings.parent_repo_mapping.get(repo.name, repo.parent)
+            self.logger.debug("Parent repository for %s: %s", repo.name, mapped_name)
+            return mapped_name
+        else:
+            self.logger.debug("No parent repository for %s, using repository name", repo.name)
+            return repo.name
+
+    def _get_topic_content(self, commit: CommitInfo) -> str:
+        # Placeholder for configurable topic content logic
+        # User can customize this method
+        topic_content = "Custom Topic Content"
+        self.logger.debug("Topic content for commit %s: %s", commit.commit_id, topic_content)
+        return topic_content
+
+    def _get_submission_time(self, commit: CommitInfo) -> str:
+        time_format = settings.submission_time_format
+        # Placeholder for actual commit time extraction
+        submission_time = datetime.datetime.now().strftime(time_format)
+        self.logger.debug("Submission time for commit %s: %s", commit.commit_id, submission_time)
+        return submission_time
+
+class CsvReleaseNoteWriter(ReleaseNoteWriter):
+    """Appends rows to a CSV file; the header is written when the file is created."""
+
+    def _write_rows(self, rows: Iterator[List[Any]]) -> int:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not self.output_path.exists() or self.output_path.stat().st_size == 0
+        row_count = 0
+        with self.output_path.open('a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(COLUMN_HEADERS)
+            for row_data in rows:
+                writer.writerow(row_data)
+                row_count += 1
+        return row_count
+
+class JsonlReleaseNoteWriter(ReleaseNoteWriter):
+    """Appends one JSON object per row, keyed by COLUMN_KEYS."""
+
+    def _write_rows(self, rows: Iterator[List[Any]]) -> int:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        row_count = 0
+        with self.output_path.open('a', encoding='utf-8') as f:
+            for row_data in rows:
+                f.write(json.dumps(dict(zip(COLUMN_KEYS, row_data)), ensure_ascii=False))
+                f.write('\n')
+                row_count += 1
+        return row_count
+
+class SqliteReleaseNoteWriter(ReleaseNoteWriter):
+    """Inserts rows into a `release_notes` table, one transaction per write."""
+
+    supports_update = True
+
+    def _write_rows(self, rows: Iterator[List[Any]]) -> int:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.output_path))
+        try:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS release_notes (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                + ', '.join(f'{key} TEXT' for key in COLUMN_KEYS) + ')'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS release_notes_commit_id ON release_notes (commit_id)')
+            with connection:
+                cursor = connection.executemany(
+                    f"INSERT INTO release_notes ({', '.join(COLUMN_KEYS)}) VALUES ({', '.join('?' * len(COLUMN_KEYS))})",
+                    rows
+                )
+                row_count = cursor.rowcount
+                # Filled while the inserts consumed the rows
+                connection.executemany(
+                    f"UPDATE release_notes SET {', '.join(f'{key} = ?' for key in COLUMN_KEYS)} "
+                    "WHERE commit_id = ? AND parent_repository = ?",
+                    (row_data + [row_data[COMMIT_ID_COLUMN], row_data[PARENT_REPOSITORY_COLUMN]]
+                     for row_data in self.pending_updates)
+                )
+            return row_count
+        finally:
+            connection.close()
+
+OUTPUT_SUFFIXES = {'xlsx': '.xlsx', 'csv': '.csv', 'jsonl': '.jsonl', 'sqlite': '.sqlite3'}
+
+def output_path_for(output_path: str, output_format: Optional[str] = None) -> str:
+    """`output_path` with the suffix of the output format (the configured one by default)."""
+    output_format = output_format or settings.output_format
+    if output_format not in OUTPUT_SUFFIXES:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return str(Path(output_path).with_suffix(OUTPUT_SUFFIXES[output_format]))
+
+def create_release_note_writer(output_path: str, release_context: Optional[ReleaseContext] = None,
+                               output_format: Optional[str] = None) -> ReleaseNoteWriter:
+    output_format = output_format or settings.output_format
+    if output_format == 'xlsx':
+        from core.excel_writer import ExcelWriter
+        return ExcelWriter(output_path, release_context=release_context)
+    writer_classes = {'csv': CsvReleaseNoteWriter, 'jsonl': JsonlReleaseNoteWriter, 'sqlite': SqliteReleaseNoteWriter}
+    if output_format not in writer_classes:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return writer_classes[output_format](output_path, release_context=release_context)
+
+def read_release_rows(path: str) -> Iterator[List[Any]]:
+    """Stream the rows of a CSV, JSONL or SQLite output back in column order."""
+    source = Path(path)
+    if source.suffix == '.csv':
+        with source.open(newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Header
+            yield from reader
+    elif source.suffix == '.jsonl':
+        with source.open(encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield [record.get(key, '') for key in COLUMN_KEYS]
+    elif source.suffix == OUTPUT_SUFFIXES['sqlite']:
+        connection = sqlite3.connect(str(source))
+        try:
+            yield from (list(row) for row in connection.execute(f"SELECT {', '.join(COLUMN_KEYS)} FROM release_notes ORDER BY id"))
+        finally:
+            connection.close()
+    else:
+        raise ValueError(f"Cannot read release rows from {source}")
+
+def export_to_xlsx(source_path: str, xlsx_path: str) -> int:
+    """Build the human-facing workbook from a fast output when it is needed; returns the number of rows."""
+    from core.excel_writer import ExcelWriter
+    writer = ExcelWriter(xlsx_path, release_context=ReleaseContext())
+    return writer.write_rows(read_release_rows(source_path))
@@ -0,0 +1,271 @@
+# core/release_pipeline.py
+
+import fcntl
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.settings import settings, RepositoryInfo
+from core.repository_scanner import RepositoryScanner
+from core.state_store import ProcessedRangeStore
+from core.commit_analyzer import CommitAnalyzer
+from core.release_note_writer import create_release_note_writer, output_path_for
+from core.release_context import ReleaseContext
+from core.run_metrics import RunMetrics
+from core.release_plan import ReleaseConfigError, _grt_repo_config, resolve_grt_versions
+from core.result_cache import ReleaseFingerprint, ReleaseResultCache, fingerprint_jobs
+from utils.logger import get_logger, verbose_console
+from utils.common import normalize_tag
+from utils.event_bus import ProgressCallback
+from rich.console import Console
+from rich.table import Table
+
+@contextmanager
+def _output_lock(output_path: str) -> Iterator[None]:
+    """Serialise writers of one output across threads, worker processes and hosts sharing its filesystem.
+
+    The writers and the <output>.commit-index sidecar are read-modify-write, so the whole
+    write stage holds an exclusive flock on <output>.lock (NFS clients map it to a POSIX lock).
+    """
+    lock_path = Path(output_path + '.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    # A descriptor per call: flocks taken through separate opens also exclude threads of this process
+    with lock_path.open('a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _print_commits(console: Console, repositories: List[RepositoryInfo]) -> None:
+    # Update the console output to show modified patch files
+    console.log("\n[bold yellow]Updated Repository Information:[/bold yellow]")
+    for repo_info in repositories:
+        if repo_info.name in ['grpower', 'nebula'] or (repo_info.parent and repo_info.parent == 'nebula'):
+            console.log(f"\n[bold cyan]Repository: {repo_info.name}[/bold cyan]")
+            for commit in repo_info.commits:
+                if commit.patch_file:
+                    console.log(f"Commit ID: {commit.commit_id}")
+                    console.log(f"Updated Patch Files:\n{commit.patch_file}")
+
+    # Output the repositories with commits in order
+    for repo_info in repositories:
+        parent_info = f"Parent Repository: {repo_info.parent}" if repo_info.parent else "Parent Repository: None"
+        console.log(f"{parent_info} - Repository: {repo_info.name}")
+        for commit in repo_info.commits:
+            console.log(f"Commit ID: {commit.commit_id}")
+            console.log(f"Commit Message:\n{commit.message}")
+            console.log(f"Patch File: {commit.patch_file if commit.patch_file else 'None'}\n")
+
+def _print_summary(console: Console, repositories: List[RepositoryInfo]) -> None:
+    # One table row per repository instead of one block per commit
+    table = Table(title="Release summary")
+    table.add_column("Parent Repository")
+    table.add_column("Repository")
+    table.add_column("Commits", justify="right")
+    table.add_column("With patch", justify="right")
+    total_commits = 0
+    for repo_info in repositories:
+        with_patch = sum(1 for commit in repo_info.commits if commit.patch_file)
+        total_commits += len(repo_info.commits)
+        table.add_row(repo_info.parent or "None", repo_info.name, str(len(repo_info.commits)), str(with_patch))
+    console.print(table)
+    console.log(f"{len(repositories)} repositories, {total_commits} commits")
+
+def run_release_pipeline(latest_version: Optional[str] = None, previous_version: Optional[str] = None,
+                         excel_output_path: Optional[str] = None,
+                         progress: Optional[ProgressCallback] = None) -> List[RepositoryInfo]:
+    console = Console()
+    logger = get_logger('Main')
+
+    run_metrics = RunMetrics()
+
+    def forward(event: str, fields: Dict[str, Any]) -> None:
+        run_metrics.on_event(event, fields)
+        if progress is not None:
+            progress(event, fields)
+
+    def report(event: str, **fields: Any) -> None:
+        forward(event, fields)
+
+    report('stage_started', stage='versions')
+    try:
+        grt_latest_tag, grt_latest_version, grt_previous_version = resolve_grt_versions(latest_version, previous_version)
+    except ReleaseConfigError as e:
+        console.log(f"[red]{e}[/red]")
+        logger.error(str(e))
+        raise
+
+    console.log(f"grt Latest version: {grt_latest_version}")
+    logger.info(f"grt Latest version: {grt_latest_version}")
+    console.log(f"grt Previous version: {grt_previous_version}")
+    logger.info(f"grt Previous version: {grt_previous_version}")
+
+    report('stage_finished', stage='versions')
+    report('versions_resolved', latest_version=grt_latest_version, previous_version=grt_previous_version)
+
+    # Scan repositories and manifest projects; results keep the configured order
+    state_store = ProcessedRangeStore() if settings.incremental_runs else None
+    scanner = RepositoryScanner(grt_latest_version, grt_previous_version, workers=settings.scan_workers,
+                                state_store=state_store, progress=forward)
+    report('stage_started', stage='manifest')
+    scan_jobs = scanner.build_jobs()
+    report('stage_finished', stage='manifest', repositories=len(scan_jobs))
+    # Keyed by the tag commits as they are before the scan, so a tag moved meanwhile cannot be cached under the old key
+    fingerprint = fingerprint_jobs(grt_latest_version, grt_previous_version, scan_jobs) if settings.result_cache_enabled else None
+    report('stage_started', stage='scan', repositories=len(scan_jobs))
+    all_repositories_with_commits: List[RepositoryInfo] = scanner.scan(scan_jobs)
+    report('stage_finished', stage='scan', repositories=len(all_repositories_with_commits))
+
+    all_repositories_with_commits = _remove_deletable(all_repositories_with_commits, console, logger)
+
+    report('stage_started', stage='analysis')
+    commit_analyzer = CommitAnalyzer()
+    commit_analyzer.analyze_commits(all_repositories_with_commits)
+    report('stage_finished', stage='analysis')
+
+    _output_commits(all_repositories_with_commits, console, logger)
+    if fingerprint is not None:
+        _cache_results([(fingerprint, all_repositories_with_commits)], logger, report)
+
+    # Write commits in the configured output format
+    # Resolve run-wide columns once instead of per row
+    output_path = output_path_for(excel_output_path or settings.excel_output_path)
+    release_context = ReleaseContext.resolve(latest_git_tag=grt_latest_tag)
+    report('stage_started', stage='excel', rows=sum(len(repo.commits) for repo in all_repositories_with_commits))
+    with _output_lock(output_path):
+        excel_writer = create_release_note_writer(output_path, release_context=release_context)
+        excel_writer.write_commits(all_repositories_with_commits)
+    report('stage_finished', stage='excel')
+    logger.info(f"{output_path} updated with commit information")
+    console.log(f"[bold green]{output_path} updated with commit information[/bold green]")
+
+    run_metrics.excel_save_seconds = excel_writer.save_seconds
+    _finish_run(run_metrics, output_path, logger, latest_version=grt_latest_version,
+                previous_version=grt_previous_version,
+                commits=sum(len(repo.commits) for repo in all_repositories_with_commits))
+    return all_repositories_with_commits
+
+def run_release_batch(versions: List[str], excel_output_path: Optional[str] = None,
+                      progress: Optional[ProgressCallback] = None) -> List[Tuple[str, List[RepositoryInfo]]]:
+    """Release notes for consecutive grt versions, oldest first: (version, repositories) for each release after the first.
+
+    Every repository's history is walked once for the whole span and each commit is
+    assigned to the release whose tag first reaches it; all rows are written in one save.
+    """
+    console = Console()
+    logger = get_logger('Main')
+    run_metrics = RunMetrics()
+
+    def forward(event: str, fields: Dict[str, Any]) -> None:
+        run_metrics.on_event(event, fields)
+        if progress is not None:
+            progress(event, fields)
+
+    def report(event: str, **fields: Any) -> None:
+        forward(event, fields)
+
+    try:
+        grt_tag_prefix = _grt_repo_config().tag_prefix
+        versions = [normalize_tag(version, grt_tag_prefix) for version in versions]
+        if len(versions) < 2 or len(set(versions)) != len(versions):
+            raise ReleaseConfigError("Batch mode needs at least two distinct consecutive versions")
+    except ReleaseConfigError as e:
+        console.log(f"[red]{e}[/red]")
+        logger.error(str(e))
+        raise
+    console.log(f"grt versions: {', '.join(versions)}")
+    logger.info(f"grt versions: {', '.join(versions)}")
+    report('versions_resolved', latest_version=versions[-1], previous_version=versions[0], versions=versions)
+
+    state_store = ProcessedRangeStore() if settings.incremental_runs else None
+    scanner = RepositoryScanner(versions[-1], versions[0], workers=settings.scan_workers,
+                                state_store=state_store, progress=forward)
+    report('stage_started', stage='manifest')
+    scan_jobs = scanner.build_jobs()
+    report('stage_finished', stage='manifest', repositories=len(scan_jobs))
+    fingerprints = [fingerprint_jobs(version, previous, scan_jobs) for previous, version in zip(versions, versions[1:])] \
+        if settings.result_cache_enabled else []
+    report('stage_started', stage='scan', repositories=len(scan_jobs))
+    intervals = scanner.scan_ranges(scan_jobs, versions)
+    report('stage_finished', stage='scan', repositories=sum(len(repositories) for repositories in intervals))
+
+    releases: List[Tuple[str, List[RepositoryInfo]]] = []
+    report('stage_started', stage='analysis')
+    for version, repositories in zip(versions[1:], intervals):
+        console.log(f"[bold cyan]Release {version}[/bold cyan]")
+        repositories = _remove_deletable(repositories, console, logger)
+        # Removal and forced patches are collected per release, as in a single run
+        CommitAnalyzer().analyze_commits(repositories)
+        _output_commits(repositories, console, logger)
+        releases.append((version, repositories))
+    report('stage_finished', stage='analysis')
+    if fingerprints:
+        _cache_results([(fingerprint, repositories) for fingerprint, (_, repositories) in zip(fingerprints, releases)],
+                       logger, report)
+
+    output_path = output_path_for(excel_output_path or settings.excel_output_path)
+    base_context = ReleaseContext.resolve(latest_git_tag='')
+    contexts = [ReleaseContext(latest_git_tag=grt_tag_prefix + version,
+                               specific_repo_last_commits=base_context.specific_repo_last_commits)
+                for version, _ in releases]
+    total_commits = sum(len(repo.commits) for _, repositories in releases for repo in repositories)
+    report('stage_started', stage='excel', rows=total_commits)
+    with _output_lock(output_path):
+        excel_writer = create_release_note_writer(output_path, release_context=base_context)
+        excel_writer.write_releases([(context, repositories) for context, (_, repositories) in zip(contexts, releases)])
+    report('stage_finished', stage='excel')
+    logger.info(f"{output_path} updated with {len(releases)} releases")
+    console.log(f"[bold green]{output_path} updated with {len(releases)} releases[/bold green]")
+
+    run_metrics.excel_save_seconds = excel_writer.save_seconds
+    _finish_run(run_metrics, output_path, logger, latest_version=versions[-1], previous_version=versions[0],
+                versions=versions, commits=total_commits)
+    return releases
+
+def _remove_deletable(repositories: List[RepositoryInfo], console: Console, logger: logging.Logger) -> List[RepositoryInfo]:
+    deletable_substrings = settings.deletable_repos
+    if not deletable_substrings:
+        return repositories
+    kept = [
+        repo for repo in repositories
+        if not any(deletable_substr in repo.path for deletable_substr in deletable_substrings)
+    ]
+    removed_count = len(repositories) - len(kept)
+    logger.info(f"Removed {removed_count} repositories based on deletable paths")
+    console.log(f"[yellow]Removed {removed_count} repositories based on deletable paths[/yellow]")
+    return kept
+
+def _output_commits(repositories: List[RepositoryInfo], console: Console, logger: logging.Logger) -> None:
+    if verbose_console():
+        _print_commits(console, repositories)
+    else:
+        _print_summary(console, repositories)
+    for repo_info in repositories:
+        logger.info("Output commits for repository: %s", repo_info.name)
+        for commit in repo_info.commits:
+            logger.debug("Commit ID: %s, Patch File: %s", commit.commit_id, commit.patch_file)
+
+def _cache_results(results: List[Tuple[ReleaseFingerprint, List[RepositoryInfo]]], logger: logging.Logger,
+                   report: Callable[..., None]) -> None:
+    # Served by the /releases endpoints; a cache failure must not fail the run
+    try:
+        result_cache = ReleaseResultCache()
+        for fingerprint, repositories in results:
+            result_cache.put(fingerprint, repositories)
+            report('result_cached', result_key=fingerprint.key, latest_version=fingerprint.latest_version,
+                   previous_version=fingerprint.previous_version)
+    except sqlite3.Error as e:
+        logger.error(f"Error caching release results: {e}")
+
+def _finish_run(run_metrics: RunMetrics, output_path: str, logger: logging.Logger, **summary: Any) -> None:
+    run_report = run_metrics.finish(output_path=output_path, **summary)
+    if settings.run_report_enabled:
+        report_path = settings.run_report_path or str(Path(output_path).with_name('run_report.json'))
+        try:
+            run_metrics.write(report_path)
+            logger.info("Run report written to %s", report_path)
+        except OSError as e:
+            logger.error(f"Error writing run report {report_path}: {e}")
+    logger.info("Run finished in %.2fs: %s", run_report['total_seconds'], run_report['stages'])
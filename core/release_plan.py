@@ -0,0 +1,148 @@
+# core/release_plan.py
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings, RepositoryConfig
+from core.git_handler import GitHandler
+from core.manifest_parser import ManifestParser
+from utils.common import normalize_tag
+
+# Only settings, manifests and tag refs are touched here (no rich/openpyxl, no log walks), so plans stay fast
+
+class ReleaseConfigError(Exception):
+    pass
+
+@dataclass
+class ScanJob:
+    name: str
+    path: str
+    parent: Optional[str]
+    tag_prefix: str
+    generate_patches: bool
+
+def _grt_repo_config() -> RepositoryConfig:
+    grt_repo_config = next((repo for repo in settings.repositories if repo.name == 'grt'), None)
+    if grt_repo_config is None:
+        raise ReleaseConfigError("grt repository not found in settings")
+    return grt_repo_config
+
+def resolve_grt_versions(latest_version: Optional[str] = None,
+                         previous_version: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    """Return (grt latest tag, latest version, previous version), filling in whatever was not given from grt's tags.
+
+    Without a previous version, the grt tag before the latest one is used.
+    """
+    grt_repo_config = _grt_repo_config()
+    grt_tag_prefix = grt_repo_config.tag_prefix
+
+    if latest_version is None:
+        grt_git_handler = GitHandler(grt_repo_config.path)
+        grt_latest_tag, grt_previous_tag = grt_git_handler.get_last_two_tags()
+        # Normalize tags to get version numbers
+        latest_version = normalize_tag(grt_latest_tag, grt_tag_prefix)
+        if previous_version is None:
+            previous_version = normalize_tag(grt_previous_tag, grt_tag_prefix) if grt_previous_tag else None
+    elif previous_version is None:
+        # Only the latest version given: compare against the grt tag before it
+        grt_latest_tag = grt_tag_prefix + latest_version
+        ref_snapshot = GitHandler(grt_repo_config.path).get_ref_snapshot()
+        if not ref_snapshot.has_tag(grt_latest_tag):
+            raise ReleaseConfigError(f"grt tag {grt_latest_tag} not found")
+        grt_previous_tag = ref_snapshot.tag_before(grt_latest_tag, grt_tag_prefix)
+        if grt_previous_tag is None:
+            raise ReleaseConfigError(f"No grt tag before {grt_latest_tag}; give the previous version")
+        previous_version = normalize_tag(grt_previous_tag, grt_tag_prefix)
+    return grt_tag_prefix + latest_version, latest_version, previous_version
+
+def build_scan_jobs() -> List[ScanJob]:
+    """Configured repositories followed by their manifest projects, in configuration order."""
+    jobs: List[ScanJob] = []
+    for repo_config in settings.repositories:
+        jobs.append(ScanJob(
+            name=repo_config.name,
+            path=repo_config.path,
+            parent=None,
+            tag_prefix=repo_config.tag_prefix,
+            generate_patches=repo_config.name not in ['grpower', 'nebula']
+        ))
+
+        # Process submodules if manifest exists
+        if repo_config.manifest:
+            for project in ManifestParser(repo_config).parse():
+                # Do not generate patches for sub-repositories of 'nebula' or for 'grpower' and 'nebula' projects
+                project_generate_patches = not (repo_config.name == 'nebula' or project['name'] in ['grpower', 'nebula'])
+                jobs.append(ScanJob(
+                    name=project['name'],
+                    path=project['absolute_path'],
+                    parent=repo_config.name,
+                    tag_prefix=repo_config.tag_prefix,
+                    generate_patches=project_generate_patches
+                ))
+    return jobs
+
+@dataclass
+class PlannedJob:
+    job: ScanJob
+    latest_tag: str
+    previous_tag: str
+    latest_commit: Optional[str]
+    previous_commit: Optional[str]
+    error: Optional[str] = None
+
+    @property
+    def will_process(self) -> bool:
+        # Same rule as the scanner: both tags must exist
+        return self.latest_commit is not None and self.previous_commit is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.job.name,
+            'parent': self.job.parent,
+            'path': self.job.path,
+            'latest_tag': self.latest_tag,
+            'latest_commit': self.latest_commit,
+            'previous_tag': self.previous_tag,
+            'previous_commit': self.previous_commit,
+            'generate_patches': self.job.generate_patches,
+            'will_process': self.will_process,
+            'error': self.error,
+        }
+
+@dataclass
+class ReleasePlan:
+    latest_version: str
+    previous_version: Optional[str]
+    jobs: List[PlannedJob]
+
+    @property
+    def processed(self) -> List[PlannedJob]:
+        return [planned for planned in self.jobs if planned.will_process]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'latest_version': self.latest_version,
+            'previous_version': self.previous_version,
+            'repositories': [planned.to_dict() for planned in self.jobs],
+            'will_process': len(self.processed),
+        }
+
+def _plan_job(job: ScanJob, latest_version: str, previous_version: Optional[str]) -> PlannedJob:
+    latest_tag = job.tag_prefix + latest_version
+    previous_tag = job.tag_prefix + previous_version if previous_version else ''
+    try:
+        ref_snapshot = GitHandler(job.path).get_ref_snapshot()
+    except Exception as e:
+        return PlannedJob(job, latest_tag, previous_tag, None, None, error=str(e))
+    return PlannedJob(job, latest_tag, previous_tag, ref_snapshot.tag_commit(latest_tag),
+                      ref_snapshot.tag_commit(previous_tag) if previous_tag else None)
+
+def plan_release(latest_version: Optional[str] = None, previous_version: Optional[str] = None,
+                 workers: Optional[int] = None) -> ReleasePlan:
+    """Resolve the version pair and check both tags in every repository/project, reading refs only."""
+    _, latest_version, previous_version = resolve_grt_versions(latest_version, previous_version)
+    jobs = build_scan_jobs()
+    workers = max(1, workers or settings.scan_workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plan') as executor:
+        planned = list(executor.map(lambda job: _plan_job(job, latest_version, previous_version), jobs))
+    return ReleasePlan(latest_version=latest_version, previous_version=previous_version, jobs=planned)
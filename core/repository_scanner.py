@@ -0,0 +1,298 @@
+# core/repository_scanner.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
+import datetime
+import time
+import uuid
+from pathlib import Path
+from config.settings import settings, RepositoryInfo, CommitInfo
+from core.release_plan import ScanJob, build_scan_jobs
+from core.git_handler import GitHandler
+from core.patch_manager import PatchManager
+from core.patch_store import PatchStore
+from core.state_store import ProcessedRangeStore
+from utils.logger import get_logger, verbose_console
+from utils.event_bus import ProgressCallback
+from rich.console import Console
+
+class RepositoryScanner:
+    """Resolve tags, commits and patches for repositories and manifest projects, optionally in parallel."""
+
+    def __init__(self, latest_version: str, previous_version: Optional[str], workers: int = 1, patch_output_dir: str = '',
+                 state_store: Optional[ProcessedRangeStore] = None, progress: Optional[ProgressCallback] = None,
+                 patch_store: Optional[PatchStore] = None) -> None:
+        self.latest_version = latest_version
+        self.previous_version = previous_version
+        # Dedicated directory for this run's patches; one sub-directory per repository/project
+        self.patch_output_dir = Path(patch_output_dir or self.default_patch_output_dir(latest_version))
+        self.workers = max(1, workers)
+        # Previously processed ranges are reused from here and new ones recorded as each job finishes
+        self.state_store = state_store
+        # Shared, patch-id addressed patch files; the run directory then only holds patches without a diff
+        self.patch_store = patch_store if patch_store is not None else (PatchStore() if settings.patch_store_enabled else None)
+        self.progress = progress
+        self.logger = get_logger('RepositoryScanner')
+        self.console = Console()
+        self.verbose = verbose_console()
+
+    @staticmethod
+    def default_patch_output_dir(latest_version: str) -> str:
+        # The random suffix keeps concurrent runs of the same release apart
+        run_id = f"{latest_version}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        return str(Path(settings.patch_output_dir) / run_id)
+
+    def patch_dir_for(self, job: ScanJob, version: Optional[str] = None) -> Path:
+        # Multi-release runs keep each release's patches under its version
+        return self.patch_output_dir / (version or '') / (job.parent or '') / job.name
+
+    def build_jobs(self) -> List[ScanJob]:
+        jobs = build_scan_jobs()
+        for repo_config in settings.repositories:
+            if repo_config.manifest:
+                project_count = sum(1 for job in jobs if job.parent == repo_config.name)
+                self.console.log(f"Found {project_count} projects in manifest of {repo_config.name}")
+                self.logger.info(f"Parsed {project_count} projects in manifest for {repo_config.name}")
+            else:
+                self.console.log(f"No manifest found for {repo_config.name}")
+                self.logger.warning(f"No manifest found for {repo_config.name}")
+        return jobs
+
+    def scan(self, jobs: List[ScanJob]) -> List[RepositoryInfo]:
+        self.logger.info(f"Scanning {len(jobs)} repositories with {self.workers} worker(s)")
+        if self.workers == 1:
+            results = [self.scan_job(job) for job in jobs]
+        else:
+            # executor.map yields results in submission order, so the output order is unchanged
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scan') as executor:
+                results = list(executor.map(self.scan_job, jobs))
+        return [repo_info for repo_info in results if repo_info is not None]
+
+    def scan_ranges(self, jobs: List[ScanJob], versions: List[str]) -> List[List[RepositoryInfo]]:
+        """Scan consecutive releases versions[0] -> versions[1] -> ... with one history walk per repository.
+
+        Returns one repository list per interval, in the order of `versions`.
+        """
+        self.logger.info(f"Scanning {len(jobs)} repositories over {len(versions) - 1} releases with {self.workers} worker(s)")
+        if self.workers == 1:
+            results = [self.scan_job_ranges(job, versions) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scan') as executor:
+                results = list(executor.map(lambda job: self.scan_job_ranges(job, versions), jobs))
+        intervals: List[List[RepositoryInfo]] = [[] for _ in range(len(versions) - 1)]
+        for job_results in results:
+            for index, repo_info in enumerate(job_results):
+                if repo_info is not None:
+                    intervals[index].append(repo_info)
+        return intervals
+
+    def _report(self, event: str, job: ScanJob, **fields: Any) -> None:
+        if self.progress is not None:
+            self.progress(event, {'repository': job.name, 'parent': job.parent, 'path': job.path, **fields})
+
+    def scan_job(self, job: ScanJob) -> Optional[RepositoryInfo]:
+        self._report('repository_started', job)
+        start = time.perf_counter()
+        try:
+            repo_info = self._scan_job(job)
+        except Exception as e:
+            error_message = f"Error processing repository {job.name} at {job.path}: {e}"
+            self.logger.error(error_message)
+            self.console.log(f"[red]{error_message}[/red]")
+            self._report('repository_failed', job, error=str(e), elapsed=time.perf_counter() - start)
+            return None
+        self._report('repository_finished', job, commits=len(repo_info.commits) if repo_info else 0,
+                     elapsed=time.perf_counter() - start)
+        return repo_info
+
+    def scan_job_ranges(self, job: ScanJob, versions: List[str]) -> List[Optional[RepositoryInfo]]:
+        self._report('repository_started', job)
+        start = time.perf_counter()
+        try:
+            results = self._scan_job_ranges(job, versions)
+        except Exception as e:
+            error_message = f"Error processing repository {job.name} at {job.path}: {e}"
+            self.logger.error(error_message)
+            self.console.log(f"[red]{error_message}[/red]")
+            self._report('repository_failed', job, error=str(e), elapsed=time.perf_counter() - start)
+            return [None] * (len(versions) - 1)
+        self._report('repository_finished', job, commits=sum(len(repo.commits) for repo in results if repo),
+                     elapsed=time.perf_counter() - start)
+        return results
+
+    def _scan_job(self, job: ScanJob) -> Optional[RepositoryInfo]:
+        # Construct expected tags
+        latest_tag = job.tag_prefix + self.latest_version
+        previous_tag = job.tag_prefix + self.previous_version if self.previous_version else ''
+
+        if self.verbose:
+            self.console.log(f"[cyan]Processing repository: {job.name} at {job.path}[/cyan]")
+        self.logger.info(f"Processing repository: {job.name} at {job.path}")
+
+        git_handler = GitHandler(job.path)
+
+        # Look the expected tags up in the repository's tag index
+        ref_snapshot = git_handler.get_ref_snapshot()
+
+        latest_tag_exists = ref_snapshot.has_tag(latest_tag)
+        previous_tag_exists = ref_snapshot.has_tag(previous_tag) if previous_tag else False
+
+        if self.verbose:
+            self.console.log(f"Expected latest tag: {latest_tag}, Exists: {latest_tag_exists}")
+        self.logger.info(f"Expected latest tag: {latest_tag}, Exists: {latest_tag_exists}")
+
+        if not latest_tag_exists:
+            self.console.log(f"[red]Latest tag {latest_tag} does not exist in {job.path}[/red]")
+            self.logger.warning(f"Latest tag {latest_tag} does not exist in {job.path}")
+
+        if previous_tag and not previous_tag_exists:
+            self.console.log(f"[red]Previous tag {previous_tag} does not exist in {job.path}[/red]")
+            self.logger.warning(f"Previous tag {previous_tag} does not exist in {job.path}")
+
+        if not (latest_tag_exists and previous_tag_exists):
+            return None
+
+        previous_commit = ref_snapshot.tag_commit(previous_tag) or ''
+        latest_commit = ref_snapshot.tag_commit(latest_tag) or ''
+        commit_infos = None
+        if self.state_store is not None:
+            commit_infos = self.state_store.lookup(job.path, previous_tag, latest_tag,
+                                                   previous_commit, latest_commit, job.generate_patches)
+            if commit_infos is not None:
+                self.logger.info(f"Reusing {len(commit_infos)} recorded commits for {job.name} ({previous_tag}...{latest_tag})")
+        if commit_infos is None:
+            commit_infos = self._collect_commits(job, git_handler, previous_tag, latest_tag)
+            if self.state_store is not None:
+                self.state_store.save(job.path, previous_tag, latest_tag,
+                                      previous_commit, latest_commit, job.generate_patches, commit_infos)
+        if not commit_infos:
+            return None
+
+        self.logger.info(f"Added {len(commit_infos)} commits for repository {job.name}")
+        return RepositoryInfo(
+            name=job.name,
+            path=job.path,
+            parent=job.parent,
+            latest_tag=latest_tag,
+            previous_tag=previous_tag,
+            commits=commit_infos
+        )
+
+    def _scan_job_ranges(self, job: ScanJob, versions: List[str]) -> List[Optional[RepositoryInfo]]:
+        tags = [job.tag_prefix + version for version in versions]
+        results: List[Optional[RepositoryInfo]] = [None] * (len(tags) - 1)
+        if self.verbose:
+            self.console.log(f"[cyan]Processing repository: {job.name} at {job.path}[/cyan]")
+        self.logger.info(f"Processing repository: {job.name} at {job.path} for {len(results)} releases")
+
+        git_handler = GitHandler(job.path)
+        ref_snapshot = git_handler.get_ref_snapshot()
+        tag_commits = [ref_snapshot.tag_commit(tag) or '' for tag in tags]
+        for tag, tag_commit in zip(tags, tag_commits):
+            if not tag_commit:
+                self.logger.warning(f"Tag {tag} does not exist in {job.path}")
+        # Interval i covers tags[i]..tags[i + 1]; like a single run, both tags must exist
+        wanted = [index for index in range(len(results)) if tag_commits[index] and tag_commits[index + 1]]
+        if not wanted:
+            return results
+
+        commits_by_interval: Dict[int, List[CommitInfo]] = {}
+        if self.state_store is not None:
+            for index in wanted:
+                commit_infos = self.state_store.lookup(job.path, tags[index], tags[index + 1], tag_commits[index],
+                                                       tag_commits[index + 1], job.generate_patches)
+                if commit_infos is not None:
+                    commits_by_interval[index] = commit_infos
+        missing = [index for index in wanted if index not in commits_by_interval]
+        if missing:
+            collected = self._collect_interval_commits(job, git_handler, versions, tags, tag_commits, missing)
+            for index in missing:
+                commits_by_interval[index] = collected[index]
+                if self.state_store is not None:
+                    self.state_store.save(job.path, tags[index], tags[index + 1], tag_commits[index],
+                                          tag_commits[index + 1], job.generate_patches, collected[index])
+
+        for index in wanted:
+            if commits_by_interval[index]:
+                results[index] = RepositoryInfo(
+                    name=job.name,
+                    path=job.path,
+                    parent=job.parent,
+                    latest_tag=tags[index + 1],
+                    previous_tag=tags[index],
+                    commits=commits_by_interval[index]
+                )
+        return results
+
+    def _collect_interval_commits(self, job: ScanJob, git_handler: GitHandler, versions: List[str], tags: List[str],
+                                  tag_commits: List[str], wanted: List[int]) -> Dict[int, List[CommitInfo]]:
+        # One walk from the newest wanted tag down to the oldest; every existing tag in between is a tip
+        lower, upper = min(wanted), max(wanted) + 1
+        tips = [index for index in range(lower + 1, upper + 1) if tag_commits[index]]
+        start = time.perf_counter()
+        graph = list(git_handler.iter_commit_graph([tags[index] for index in tips], tags[lower]))
+        parents = {commit['commit_id']: commit['parents'] for commit in graph}
+
+        # A commit belongs to the oldest tag that reaches it. Tips are labelled oldest first and a walk
+        # stops at labelled commits, whose ancestors are already labelled, so each commit is visited once.
+        labels: Dict[str, int] = {}
+        for tip in tips:
+            stack = [tag_commits[tip]]
+            while stack:
+                commit_id = stack.pop()
+                if commit_id in labels or commit_id not in parents:
+                    continue
+                labels[commit_id] = tip
+                stack.extend(parents[commit_id])
+
+        wanted_tips = {index + 1 for index in wanted}
+        collected: Dict[int, List[CommitInfo]] = {index: [] for index in wanted}
+        for commit in graph:
+            tip = labels.get(commit['commit_id'])
+            # Merges are walked for reachability but not reported, as with --no-merges
+            if tip in wanted_tips and len(commit['parents']) <= 1:
+                collected[tip - 1].append(CommitInfo(commit_id=commit['commit_id'], message=commit['message']))
+        self._report('commits_found', job, commits=sum(len(commits) for commits in collected.values()),
+                     seconds=time.perf_counter() - start)
+
+        if job.generate_patches and any(collected.values()):
+            start = time.perf_counter()
+            # git numbers patches oldest first; log order is newest first
+            targets: Dict[str, Tuple[Path, int]] = {}
+            messages: Dict[str, str] = {}
+            for index, commit_infos in collected.items():
+                patch_dir = self.patch_dir_for(job, versions[index + 1])
+                for position, commit_info in enumerate(commit_infos):
+                    targets[commit_info.commit_id] = (patch_dir, len(commit_infos) - position)
+                    messages[commit_info.commit_id] = commit_info.message
+            patch_manager = PatchManager(job.path, tags[lower], tags[upper], patch_store=self.patch_store)
+            commit_patch_map = patch_manager.generate_interval_patch_map([tags[index] for index in tips], targets, messages)
+            self._report('patches_written', job, patches=len(commit_patch_map), stored=patch_manager.patches_stored,
+                         deduplicated=patch_manager.patches_deduplicated, seconds=time.perf_counter() - start)
+            for commit_infos in collected.values():
+                for commit_info in commit_infos:
+                    patch_file = commit_patch_map.get(commit_info.commit_id)
+                    commit_info.patch_file = str(patch_file) if patch_file else None
+        return collected
+
+    def _collect_commits(self, job: ScanJob, git_handler: GitHandler, previous_tag: str, latest_tag: str) -> List[CommitInfo]:
+        # Build commit records while git log is still streaming
+        start = time.perf_counter()
+        commit_infos: List[CommitInfo] = [
+            CommitInfo(commit_id=commit['commit_id'], message=commit['message'])
+            for commit in git_handler.iter_commit_logs_between_tags(previous_tag, latest_tag)
+        ]
+        self._report('commits_found', job, commits=len(commit_infos), seconds=time.perf_counter() - start)
+        if commit_infos and job.generate_patches:
+            start = time.perf_counter()
+            patch_manager = PatchManager(job.path, previous_tag, latest_tag, patch_store=self.patch_store)
+            messages = {commit_info.commit_id: commit_info.message for commit_info in commit_infos}
+            commit_patch_map: Dict[str, Path] = patch_manager.generate_patch_map(str(self.patch_dir_for(job)), messages)
+            self._report('patches_written', job, patches=len(commit_patch_map), stored=patch_manager.patches_stored,
+                         deduplicated=patch_manager.patches_deduplicated, seconds=time.perf_counter() - start)
+
+            for commit_info in commit_infos:
+                patch_file = commit_patch_map.get(commit_info.commit_id)
+                commit_info.patch_file = str(patch_file) if patch_file else None
+                self.logger.debug("Commit ID: %s mapped to Patch File: %s", commit_info.commit_id, commit_info.patch_file)
+        return commit_infos
@@ -0,0 +1,114 @@
+# core/result_cache.py
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config.settings import settings, RepositoryInfo
+from core.git_handler import GitHandler
+from core.release_plan import ScanJob, build_scan_jobs, resolve_grt_versions
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS release_results (
+    result_key TEXT PRIMARY KEY,
+    latest_version TEXT NOT NULL,
+    previous_version TEXT,
+    body TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+'''
+
+def default_result_cache_path() -> str:
+    return settings.result_cache_path or str(Path(settings.excel_output_path).with_name('release_results.sqlite3'))
+
+@dataclass
+class ReleaseFingerprint:
+    key: str
+    latest_version: str
+    previous_version: Optional[str]
+
+def fingerprint_jobs(latest_version: str, previous_version: Optional[str], jobs: List[ScanJob]) -> ReleaseFingerprint:
+    """Key a release by the commits its tags resolve to in every repository/project, plus the settings shaping the rows.
+
+    Only ref snapshots are read (cached, re-read when the tag refs change), so no git process runs
+    while the tags stay put.
+    """
+    repositories = []
+    for job in jobs:
+        ref_snapshot = GitHandler(job.path).get_ref_snapshot()
+        latest_tag = job.tag_prefix + latest_version
+        previous_tag = job.tag_prefix + previous_version if previous_version else ''
+        repositories.append([job.name, job.parent, job.path, ref_snapshot.tag_commit(latest_tag),
+                             ref_snapshot.tag_commit(previous_tag) if previous_tag else None])
+    identity = {
+        'latest_version': latest_version,
+        'previous_version': previous_version,
+        'repositories': repositories,
+        'commit_remove_patterns': settings.commit_remove_patterns,
+        'parent_repo_mapping': settings.parent_repo_mapping,
+        'force_update_repos': settings.force_update_repos,
+        'deletable_repos': settings.deletable_repos,
+    }
+    key = hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+    return ReleaseFingerprint(key=key, latest_version=latest_version, previous_version=previous_version)
+
+def release_fingerprint(latest_version: Optional[str] = None, previous_version: Optional[str] = None) -> ReleaseFingerprint:
+    """Fingerprint of a release as a run would resolve it now (the newest grt tags when versions are not given)."""
+    _, latest_version, previous_version = resolve_grt_versions(latest_version, previous_version)
+    return fingerprint_jobs(latest_version, previous_version, build_scan_jobs())
+
+def release_rows(repositories: List[RepositoryInfo]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'repository': repo.name,
+            'parent': repo.parent,
+            'path': repo.path,
+            'commit_id': commit.commit_id,
+            'message': commit.message,
+            'parent_repos': commit.parent_repos,
+            'patch_file': commit.patch_file,
+        }
+        for repo in repositories
+        for commit in repo.commits
+    ]
+
+class ReleaseResultCache:
+    """Release rows as JSON, keyed by ReleaseFingerprint.key; bodies are stored serialised and served as-is."""
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = Path(db_path or default_result_cache_path())
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        # Rollback journal, not WAL: the file may be shared with workers on other hosts
+        self.connection.execute('PRAGMA journal_mode=DELETE')
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.connection.execute('SELECT body FROM release_results WHERE result_key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def has(self, key: str) -> bool:
+        with self.lock:
+            return self.connection.execute('SELECT 1 FROM release_results WHERE result_key = ?', (key,)).fetchone() is not None
+
+    def put(self, fingerprint: ReleaseFingerprint, repositories: List[RepositoryInfo]) -> None:
+        body = json.dumps({
+            'result_key': fingerprint.key,
+            'latest_version': fingerprint.latest_version,
+            'previous_version': fingerprint.previous_version,
+            'rows': release_rows(repositories),
+        })
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO release_results (result_key, latest_version, previous_version, body, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (fingerprint.key, fingerprint.latest_version, fingerprint.previous_version, body,
+                 datetime.datetime.now().isoformat())
+            )
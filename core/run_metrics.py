@@ -0,0 +1,99 @@
+# core/run_metrics.py
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from core.git_handler import get_git_spawn_count, get_git_output_bytes
+from utils.metrics import metrics
+
+class RunMetrics:
+    """Timings and git accounting for one release run, collected from its progress events."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.git_processes_start = get_git_spawn_count()
+        self.git_bytes_start = get_git_output_bytes()
+        self.stage_starts: Dict[str, float] = {}
+        self.stages: Dict[str, float] = {}
+        # Summed over all repositories; with parallel scanning these exceed the scan stage's wall time
+        self.git_log_seconds = 0.0
+        self.format_patch_seconds = 0.0
+        self.patches = {'written': 0, 'stored': 0, 'deduplicated': 0}
+        self.repositories: List[Dict[str, Any]] = []
+        self.excel_save_seconds: Optional[float] = None
+        self.report: Optional[Dict[str, Any]] = None
+
+    def on_event(self, event: str, fields: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        with self.lock:
+            if event == 'stage_started':
+                self.stage_starts[fields['stage']] = now
+            elif event == 'stage_finished' and fields['stage'] in self.stage_starts:
+                self.stages[fields['stage']] = now - self.stage_starts.pop(fields['stage'])
+            elif event == 'commits_found':
+                self.git_log_seconds += fields.get('seconds', 0.0)
+            elif event == 'patches_written':
+                self.format_patch_seconds += fields.get('seconds', 0.0)
+                self.patches['written'] += fields.get('patches', 0)
+                self.patches['stored'] += fields.get('stored', 0)
+                self.patches['deduplicated'] += fields.get('deduplicated', 0)
+            elif event in ('repository_finished', 'repository_failed'):
+                self.repositories.append({
+                    'repository': fields.get('repository'),
+                    'parent': fields.get('parent'),
+                    'commits': fields.get('commits', 0),
+                    'seconds': fields.get('elapsed', 0.0),
+                    'failed': event == 'repository_failed',
+                })
+
+    def finish(self, **summary: Any) -> Dict[str, Any]:
+        total_seconds = time.perf_counter() - self.start
+        with self.lock:
+            self.report = {
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started_at)),
+                'total_seconds': total_seconds,
+                'stages': dict(self.stages),
+                'git': {
+                    # Process-wide deltas: overlapping runs are included in each other's numbers
+                    'processes': get_git_spawn_count() - self.git_processes_start,
+                    'bytes_read': get_git_output_bytes() - self.git_bytes_start,
+                    'log_seconds': self.git_log_seconds,
+                    'format_patch_seconds': self.format_patch_seconds,
+                },
+                'patches': dict(self.patches),
+                'excel_save_seconds': self.excel_save_seconds,
+                'repositories': sorted(self.repositories, key=lambda repo: repo['seconds'], reverse=True),
+                **summary,
+            }
+        self._publish(self.report)
+        return self.report
+
+    @staticmethod
+    def _publish(report: Dict[str, Any]) -> None:
+        metrics.inc('release_runs_total', help_text='Release runs completed')
+        metrics.observe('release_run_seconds', report['total_seconds'], 'Wall time of release runs')
+        for stage, seconds in report['stages'].items():
+            metrics.observe('release_stage_seconds', seconds, 'Wall time per pipeline stage', stage=stage)
+        metrics.observe('release_git_log_seconds', report['git']['log_seconds'], 'git log time summed over repositories')
+        metrics.observe('release_format_patch_seconds', report['git']['format_patch_seconds'],
+                        'git format-patch time summed over repositories')
+        if report['excel_save_seconds'] is not None:
+            metrics.observe('release_excel_save_seconds', report['excel_save_seconds'], 'Time spent saving the workbook')
+        metrics.inc('release_patches_deduplicated_total', report['patches']['deduplicated'],
+                    'Patches found in the patch store instead of being written')
+        for repo in report['repositories']:
+            metrics.observe('release_repository_seconds', repo['seconds'], 'Scan time per repository')
+        metrics.set('release_last_run_seconds', report['total_seconds'], 'Wall time of the most recent run')
+        metrics.set('release_last_run_commits', report.get('commits', 0), 'Commits written by the most recent run')
+
+    def write(self, path: str) -> None:
+        report_path = Path(path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = report_path.with_name(report_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self.report, indent=2), encoding='utf-8')
+        os.replace(tmp_path, report_path)
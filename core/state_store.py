@@ -0,0 +1,99 @@
+# core/state_store.py
+
+import datetime
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+from config.settings import settings, CommitInfo
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS processed_ranges (
+    repo_path TEXT NOT NULL,
+    previous_tag TEXT NOT NULL,
+    latest_tag TEXT NOT NULL,
+    previous_commit TEXT NOT NULL,
+    latest_commit TEXT NOT NULL,
+    with_patches INTEGER NOT NULL,
+    processed_at TEXT NOT NULL,
+    PRIMARY KEY (repo_path, previous_tag, latest_tag)
+);
+CREATE TABLE IF NOT EXISTS processed_commits (
+    repo_path TEXT NOT NULL,
+    previous_tag TEXT NOT NULL,
+    latest_tag TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    commit_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    patch_file TEXT,
+    PRIMARY KEY (repo_path, previous_tag, latest_tag, position)
+);
+'''
+
+def default_state_store_path() -> str:
+    return settings.state_store_path or str(Path(settings.excel_output_path).with_name('release_state.sqlite3'))
+
+class ProcessedRangeStore:
+    """SQLite record of which tag range each repository/project was processed for, and what it produced.
+
+    A range is only reused when both tags still resolve to the recorded commits,
+    so moved tags are recomputed. Each repository is committed as soon as it is
+    done, which lets an interrupted run resume where it stopped.
+    """
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = Path(db_path or default_state_store_path())
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # Rollback journal, not WAL: the file may be shared with workers on other hosts
+        self.connection.execute('PRAGMA journal_mode=DELETE')
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def lookup(self, repo_path: str, previous_tag: str, latest_tag: str,
+               previous_commit: str, latest_commit: str, with_patches: bool) -> Optional[List[CommitInfo]]:
+        """Commits recorded for this exact range, or None if it has to be (re)processed."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT previous_commit, latest_commit, with_patches FROM processed_ranges '
+                'WHERE repo_path = ? AND previous_tag = ? AND latest_tag = ?',
+                (repo_path, previous_tag, latest_tag)
+            ).fetchone()
+            if row is None or row[0] != previous_commit or row[1] != latest_commit or bool(row[2]) != with_patches:
+                return None
+            commit_rows = self.connection.execute(
+                'SELECT commit_id, message, patch_file FROM processed_commits '
+                'WHERE repo_path = ? AND previous_tag = ? AND latest_tag = ? ORDER BY position',
+                (repo_path, previous_tag, latest_tag)
+            ).fetchall()
+        commits = [CommitInfo(commit_id=commit_id, message=message, patch_file=patch_file)
+                   for commit_id, message, patch_file in commit_rows]
+        # Patches may have been cleaned up since; regenerate rather than point at missing files
+        if any(commit.patch_file and not Path(commit.patch_file).exists() for commit in commits):
+            return None
+        return commits
+
+    def save(self, repo_path: str, previous_tag: str, latest_tag: str,
+             previous_commit: str, latest_commit: str, with_patches: bool, commits: List[CommitInfo]) -> None:
+        key = (repo_path, previous_tag, latest_tag)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'DELETE FROM processed_commits WHERE repo_path = ? AND previous_tag = ? AND latest_tag = ?', key
+            )
+            self.connection.executemany(
+                'INSERT INTO processed_commits (repo_path, previous_tag, latest_tag, position, commit_id, message, patch_file) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [key + (position, commit.commit_id, commit.message, commit.patch_file)
+                 for position, commit in enumerate(commits)]
+            )
+            self.connection.execute(
+                'INSERT OR REPLACE INTO processed_ranges '
+                '(repo_path, previous_tag, latest_tag, previous_commit, latest_commit, with_patches, processed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                key + (previous_commit, latest_commit, int(with_patches), datetime.datetime.now().isoformat())
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
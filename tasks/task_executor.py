@@ -1,24 +1,85 @@
+from typing import Dict, Any, List, Optional
+import datetime
 from tasks.task_queue import TaskQueue, Task
-from threading import Thread
+from threading import Event, Thread
+from config.settings import settings
 from utils.event_bus import EventBus
+from utils.logger import get_logger
 
 class TaskExecutor:
-    def __init__(self, task_queue: TaskQueue) -> None:
+    def __init__(self, task_queue: TaskQueue, workers: Optional[int] = None, event_bus: Optional[EventBus] = None) -> None:
         self.task_queue = task_queue
-        self.event_bus = EventBus()
-        self.thread = Thread(target=self.run)
-        self.thread.start()
+        self.event_bus = event_bus or EventBus()
+        self.logger = get_logger('TaskExecutor')
+        self.workers = max(1, workers or settings.task_workers)
+        self.threads: List[Thread] = [
+            Thread(target=self.run, name=f'task-executor-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self.threads:
+            thread.start()
 
     def run(self) -> None:
         while True:
-            for task_id, task in self.task_queue.tasks.items():
-                if task.status == 'pending':
-                    task.status = 'running'
-                    self.execute_task(task)
-                    task.status = 'completed'
-                    self.event_bus.publish('task_completed', task)
-            time.sleep(1)
+            task = self.task_queue.next_task()
+            if task is None:
+                break
+            progress = self.event_bus.progress_callback(task_id=task.id)
+            self.event_bus.publish('task_started', task)
+            progress('task_started', {'status': task.status})
+            stop_heartbeat = Event()
+            heartbeat = Thread(target=self._heartbeat, args=(task.id, stop_heartbeat), name=f'heartbeat-{task.id}', daemon=True)
+            heartbeat.start()
+            try:
+                task.result = self.execute_task(task)
+                task.status = 'completed'
+            except Exception as e:
+                task.error = str(e)
+                task.status = 'failed'
+                self.logger.error(f"Task {task.id} failed: {e}")
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+            task.finished_at = datetime.datetime.now()
+            # Persisted before the events so a client reacting to them reads the final state
+            if not self.task_queue.finish_task(task.id, result=task.result, error=task.error):
+                self.logger.warning(f"Lease on task {task.id} was lost; its outcome is left to the worker that took it over")
+                continue
+            self.event_bus.publish(f'task_{task.status}', task)
+            progress(f'task_{task.status}', {'status': task.status, 'result': task.result, 'error': task.error})
 
-    def execute_task(self, task: Task) -> None:
-        # Implement task execution logic
-        pass
\ No newline at end of file
+    def _heartbeat(self, task_id: str, stop: Event) -> None:
+        # Renew well before the lease runs out so one slow write does not cost the task
+        while not stop.wait(settings.task_lease_seconds / 3):
+            if not self.task_queue.heartbeat(task_id):
+                self.logger.warning(f"Lost the lease on task {task_id}")
+                return
+
+    def execute_task(self, task: Task) -> Dict[str, Any]:
+        # Imported here so the API can start without loading the whole pipeline
+        from core.release_pipeline import run_release_pipeline
+        progress = self.event_bus.progress_callback(task_id=task.id)
+        result_keys: List[str] = []
+
+        def forward(event: str, fields: Dict[str, Any]) -> None:
+            if event == 'result_cached':
+                result_keys.append(fields['result_key'])
+            progress(event, fields)
+
+        repositories = run_release_pipeline(
+            latest_version=task.data.get('latest_version'),
+            previous_version=task.data.get('previous_version'),
+            excel_output_path=task.data.get('excel_output_path'),
+            progress=forward
+        )
+        return {
+            'repositories': len(repositories),
+            'commits': sum(len(repo.commits) for repo in repositories),
+            # Rows are served by GET /tasks/{task_id}/result and /releases
+            'result_key': result_keys[-1] if result_keys else None
+        }
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        self.task_queue.close()
+        for thread in self.threads:
+            thread.join(timeout)
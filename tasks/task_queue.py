@@ -1,26 +1,355 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from contextlib import contextmanager
+import datetime
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
 import uuid
+from pathlib import Path
+from config.settings import settings
+from utils.common import normalize_tag
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    request_key TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    leader_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS task_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_events_task ON task_events (task_id, seq);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (status, priority DESC, seq);
+CREATE INDEX IF NOT EXISTS tasks_request_key ON tasks (request_key, status);
+CREATE INDEX IF NOT EXISTS tasks_leader ON tasks (leader_id);
+'''
+# Columns added after the first release of the table
+MIGRATIONS = {
+    'lease_owner': 'ALTER TABLE tasks ADD COLUMN lease_owner TEXT',
+    'lease_expires_at': 'ALTER TABLE tasks ADD COLUMN lease_expires_at REAL',
+    'deleted': 'ALTER TABLE tasks ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0',
+}
+
+def default_task_queue_path() -> str:
+    return settings.task_queue_path or str(Path(settings.excel_output_path).with_name('tasks.sqlite3'))
+
+def request_key(data: Dict[str, str]) -> str:
+    """Identity of a release request: the configured repositories, the tag range and the output."""
+    grt_prefix = next((repo.tag_prefix for repo in settings.repositories if repo.name == 'grt'), '')
+    identity = {
+        'repositories': [[repo.name, repo.path, repo.manifest, repo.tag_prefix] for repo in settings.repositories],
+        'latest_version': normalize_tag((data.get('latest_version') or '').strip(), grt_prefix),
+        'previous_version': normalize_tag((data.get('previous_version') or '').strip(), grt_prefix),
+        'excel_output_path': data.get('excel_output_path') or settings.excel_output_path,
+        'output_format': settings.output_format,
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value else None
 
 class Task:
-    def __init__(self, data: Dict[str, str]) -> None:
+    def __init__(self, data: Dict[str, str], priority: int = 0) -> None:
         self.id = str(uuid.uuid4())
         self.data = data
-        self.status = 'pending'
+        self.priority = priority
+        self.status = 'pending'  # pending -> running -> completed | failed
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.datetime.now()
+        self.started_at: Optional[datetime.datetime] = None
+        self.finished_at: Optional[datetime.datetime] = None
+        # Set when this request was coalesced into an identical one; status and result are the leader's
+        self.leader_id: Optional[str] = None
+        self.attempts = 0
+        # Deleted by its requester while still running for coalesced requests
+        self.deleted = False
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'Task':
+        task = cls(json.loads(row['data']), priority=row['priority'])
+        task.id = row['id']
+        task.status = row['status']
+        task.result = json.loads(row['result']) if row['result'] else None
+        task.error = row['error']
+        task.created_at = _parse_time(row['created_at'])
+        task.started_at = _parse_time(row['started_at'])
+        task.finished_at = _parse_time(row['finished_at'])
+        task.leader_id = row['leader_id']
+        task.attempts = row['attempts']
+        task.deleted = bool(row['deleted'])
+        return task
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.id,
+            'status': self.status,
+            'data': self.data,
+            'priority': self.priority,
+            'coalesced_with': self.leader_id,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
 
 class TaskQueue:
-    def __init__(self) -> None:
-        self.tasks: Dict[str, Task] = {}
+    """Release tasks persisted in SQLite, shared by the API and any number of worker processes.
+
+    Pending tasks run highest priority first, then in submission order. A request
+    identical to one that is pending or running (same repositories, tag range and
+    output) is coalesced into it: it gets its own task id but shares the leader's
+    execution, status and result.
+
+    A claimed task is leased to its worker for settings.task_lease_seconds and kept
+    alive by heartbeats. Tasks whose lease ran out (the worker crashed or lost the
+    shared filesystem) are queued again, up to settings.task_max_attempts runs.
+    Lease times are wall-clock, so hosts sharing a queue need synchronised clocks.
+
+    Deleting a running task that others are coalesced into only hides it: the
+    execution carries on and its outcome still reaches the coalesced requests.
+    """
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = Path(db_path or default_task_queue_path())
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        # Wakes workers of this process at once; other processes notice new tasks when they poll
+        self.available = threading.Condition(self.lock)
+        self.closed = False
+        # Lease holder name for tasks claimed through this queue object
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        # Autocommit; writes take the database lock up front (BEGIN IMMEDIATE) so concurrent claims cannot interleave
+        self.connection = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # Rollback journal, not WAL: workers on other hosts may share this file over a network filesystem,
+        # where WAL's shared-memory index does not work
+        self.connection.execute('PRAGMA journal_mode=DELETE')
+        self.connection.executescript(SCHEMA)
+        columns = {row['name'] for row in self.connection.execute('PRAGMA table_info(tasks)')}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self.connection.execute(statement)
+        with self.lock:
+            self._requeue_expired()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def _requeue_expired(self) -> int:
+        """Re-queue running tasks whose lease ran out; returns how many. Caller holds self.lock."""
+        now = time.time()
+        expired = "status = 'running' AND leader_id IS NULL AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE tasks SET status = 'failed', finished_at = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "error = 'Interrupted ' || attempts || ' times; not retried' "
+                f"WHERE {expired} AND attempts >= ?",
+                (datetime.datetime.now().isoformat(), now, settings.task_max_attempts)
+            )
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = 'pending', started_at = NULL, lease_owner = NULL, lease_expires_at = NULL "
+                f"WHERE {expired}",
+                (now,)
+            )
+            return cursor.rowcount
 
-    def add_task(self, data: Dict[str, str]) -> str:
-        task = Task(data)
-        self.tasks[task.id] = task
+    def add_task(self, data: Dict[str, str], priority: int = 0) -> str:
+        task = Task(data, priority=priority)
+        key = request_key(data)
+        with self.lock:
+            with self._transaction():
+                leader = self.connection.execute(
+                    "SELECT id, priority FROM tasks WHERE request_key = ? AND leader_id IS NULL "
+                    "AND status IN ('pending', 'running') ORDER BY seq LIMIT 1",
+                    (key,)
+                ).fetchone()
+                if leader is not None:
+                    task.leader_id = leader['id']
+                    if priority > leader['priority']:
+                        # The shared execution runs as urgently as its most urgent requester
+                        self.connection.execute('UPDATE tasks SET priority = ? WHERE id = ?', (priority, leader['id']))
+                self.connection.execute(
+                    'INSERT INTO tasks (id, data, request_key, priority, status, leader_id, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (task.id, json.dumps(data), key, priority, task.status, task.leader_id, task.created_at.isoformat())
+                )
+            if task.leader_id is None:
+                self.available.notify()
         return task.id
 
-    def get_task(self, task_id: str) -> Optional[Task]:
-        return self.tasks.get(task_id)
+    def _load(self, task_id: str) -> Optional[Task]:
+        row = self.connection.execute('SELECT * FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return Task.from_row(row) if row else None
+
+    def get_task(self, task_id: str, include_deleted: bool = False) -> Optional[Task]:
+        """The task as its requester sees it; `include_deleted` also returns hidden executions (see delete_task)."""
+        with self.lock:
+            task = self._load(task_id)
+            if task is not None and task.deleted and not include_deleted:
+                return None
+            if task is not None and task.leader_id is not None:
+                leader = self._load(task.leader_id)
+                if leader is not None:
+                    task.status, task.result, task.error = leader.status, leader.result, leader.error
+                    task.started_at, task.finished_at = leader.started_at, leader.finished_at
+            return task
+
+    def execution_id(self, task_id: str) -> str:
+        """Id of the task whose execution serves `task_id` (itself unless coalesced)."""
+        with self.lock:
+            row = self.connection.execute('SELECT leader_id FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return row['leader_id'] if row and row['leader_id'] else task_id
+
+    def followers(self, task_id: str) -> List[str]:
+        with self.lock:
+            rows = self.connection.execute('SELECT id FROM tasks WHERE leader_id = ? ORDER BY seq', (task_id,)).fetchall()
+        return [row['id'] for row in rows]
 
     def delete_task(self, task_id: str) -> bool:
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+        with self.lock:
+            with self._transaction():
+                row = self.connection.execute('SELECT status, leader_id, deleted FROM tasks WHERE id = ?', (task_id,)).fetchone()
+                if row is None or row['deleted']:
+                    return False
+                has_followers = self.connection.execute(
+                    'SELECT 1 FROM tasks WHERE leader_id = ? LIMIT 1', (task_id,)
+                ).fetchone() is not None
+                if row['leader_id'] is None and row['status'] == 'running' and has_followers:
+                    # Promoting a follower would start a second run of the same release next to this one;
+                    # hide the task instead and let its outcome reach the followers through finish_task
+                    self.connection.execute('UPDATE tasks SET deleted = 1 WHERE id = ?', (task_id,))
+                    return True
+                self.connection.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                self.connection.execute('DELETE FROM task_events WHERE task_id = ?', (task_id,))
+                if row['leader_id'] is not None:
+                    # The last follower of a hidden execution takes it along unless it is running right now
+                    self.connection.execute(
+                        "DELETE FROM tasks WHERE id = ? AND deleted = 1 AND status != 'running' "
+                        "AND NOT EXISTS (SELECT 1 FROM tasks WHERE leader_id = ?)",
+                        (row['leader_id'], row['leader_id'])
+                    )
+                promoted = None
+                if row['leader_id'] is None:
+                    # Requests coalesced into a deleted task keep their place under the oldest of them
+                    successor = self.connection.execute(
+                        'SELECT id FROM tasks WHERE leader_id = ? ORDER BY seq LIMIT 1', (task_id,)
+                    ).fetchone()
+                    if successor is not None:
+                        promoted = successor['id']
+                        self.connection.execute('UPDATE tasks SET leader_id = ? WHERE leader_id = ?', (promoted, task_id))
+                        self.connection.execute('UPDATE tasks SET leader_id = NULL WHERE id = ?', (promoted,))
+                        if row['status'] not in ('pending', 'running'):
+                            # Followers already hold the finished outcome
+                            promoted = None
+            if promoted is not None:
+                self.available.notify()
+        return True
+
+    def _claim(self) -> Optional[Task]:
+        self._requeue_expired()
+        with self._transaction():
+            row = self.connection.execute(
+                "SELECT id FROM tasks WHERE status = 'pending' AND leader_id IS NULL ORDER BY priority DESC, seq LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE tasks SET status = 'running', started_at = ?, attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires_at = ? WHERE id = ?",
+                (datetime.datetime.now().isoformat(), self.owner, time.time() + settings.task_lease_seconds, row['id'])
+            )
+        return self._load(row['id'])
+
+    def next_task(self, timeout: Optional[float] = None) -> Optional[Task]:
+        """Block until a pending task is available and lease it; None on shutdown or timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.available:
+            while not self.closed:
+                task = self._claim()
+                if task is not None:
+                    return task
+                wait = settings.task_poll_interval
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        return None
+                self.available.wait(wait)
+            return None
+
+    def heartbeat(self, task_id: str) -> bool:
+        """Extend this worker's lease on a running task; False when the lease was lost to another worker."""
+        with self.lock, self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (time.time() + settings.task_lease_seconds, task_id, self.owner)
+            )
+            return cursor.rowcount == 1
+
+    def finish_task(self, task_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+        """Record the outcome of a task leased by this worker; coalesced requests see it through their leader.
+
+        Returns False (and records nothing) when the lease was lost and the task belongs to another worker now.
+        """
+        status = 'failed' if error is not None else 'completed'
+        with self.lock, self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.datetime.now().isoformat(), task_id, self.owner)
+            )
+            if cursor.rowcount == 0:
+                return False
+            # Followers get a copy so they keep the outcome if the leader is deleted
+            self.connection.execute(
+                'UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ? WHERE leader_id = ?',
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.datetime.now().isoformat(), task_id)
+            )
             return True
-        return False
\ No newline at end of file
+
+    def add_event(self, task_id: str, event: Dict[str, Any]) -> None:
+        """Persist a progress event so processes other than the executing one can stream it."""
+        with self.lock, self._transaction():
+            self.connection.execute('INSERT INTO task_events (task_id, event) VALUES (?, ?)',
+                                    (task_id, json.dumps(event, default=str)))
+
+    def events_since(self, task_id: str, after: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT seq, event FROM task_events WHERE task_id = ? AND seq > ? ORDER BY seq', (task_id, after)
+            ).fetchall()
+        return [(row['seq'], json.loads(row['event'])) for row in rows]
+
+    def close(self) -> None:
+        with self.available:
+            self.closed = True
+            self.available.notify_all()
@@ -0,0 +1,74 @@
+# tasks/worker.py
+
+import argparse
+import multiprocessing
+import signal
+import threading
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from tasks.task_queue import TaskQueue, default_task_queue_path
+from tasks.task_executor import TaskExecutor
+from utils.event_bus import EventBus
+from utils.logger import get_logger
+
+def run_worker(threads: int, queue_path: str) -> None:
+    """One worker process: lease tasks from the shared queue until SIGTERM/SIGINT, then finish the running ones.
+
+    Progress events reach the API through the queue, but run metrics stay in this process:
+    the API's /metrics only covers tasks it executes inline. Run reports (run_report_enabled) are still written.
+    """
+    logger = get_logger('Worker')
+    task_queue = TaskQueue(queue_path)
+    event_bus = EventBus()
+
+    def persist(event: Dict[str, Any]) -> None:
+        # The API streams these from the queue; it does not share this process's EventBus
+        if event.get('task_id'):
+            task_queue.add_event(event['task_id'], event)
+
+    event_bus.subscribe('progress', persist)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    executor = TaskExecutor(task_queue, workers=threads, event_bus=event_bus)
+    logger.info(f"Worker {task_queue.owner} started with {threads} threads on {task_queue.db_path}")
+    while not stop.wait(1.0):
+        pass
+    logger.info(f"Worker {task_queue.owner} stopping after its running tasks")
+    executor.shutdown()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Release task worker')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes to start on this machine')
+    parser.add_argument('--threads', type=int, default=settings.task_workers, help='Tasks each process runs at the same time')
+    parser.add_argument('--queue', default=None, help='SQLite task queue shared with the API (default: settings.task_queue_path)')
+    args = parser.parse_args(argv)
+    queue_path = args.queue or default_task_queue_path()
+    threads = max(1, args.threads)
+
+    if args.processes <= 1:
+        run_worker(threads, queue_path)
+        return
+
+    # Spawned, not forked: the parent's threads and SQLite handles must not leak into the workers
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=run_worker, args=(threads, queue_path), name=f'release-worker-{index}')
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum: int, _frame: Any) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    # Ctrl-C already reaches every process in the group; SIGTERM is forwarded
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+if __name__ == '__main__':
+    main()
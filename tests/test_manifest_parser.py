@@ -0,0 +1,49 @@
+import json
+
+from config.settings import RepositoryConfig
+from core.manifest_parser import ManifestCache, ManifestParser
+
+def _parse(tmp_path, manifest_xml):
+    manifest = tmp_path / 'manifest.xml'
+    manifest.write_text(manifest_xml)
+    repo_config = RepositoryConfig(name='nebula', path=str(tmp_path), manifest=str(manifest), tag_prefix='')
+    return ManifestParser(repo_config, cache=ManifestCache(str(tmp_path / 'cache.json'))).parse()
+
+def test_top_level_projects(tmp_path):
+    projects = _parse(tmp_path, '<manifest><project name="a" path="x/a"/><project name="b"/></manifest>')
+    assert [(p['name'], p['path']) for p in projects] == [('a', 'x/a'), ('b', 'b')]
+    assert projects[0]['absolute_path'] == str(tmp_path / 'x' / 'a')
+
+def test_projects_nested_under_projects_element(tmp_path):
+    # jiri manifests group projects under <projects>
+    projects = _parse(tmp_path, '<manifest><imports/><projects>'
+                                '<project name="zircon"/><project name="garnet" path="garnet"/>'
+                                '</projects></manifest>')
+    assert [p['name'] for p in projects] == ['zircon', 'garnet']
+
+def test_nested_remove_project(tmp_path):
+    projects = _parse(tmp_path, '<manifest><projects><project name="zircon"/><project name="garnet"/></projects>'
+                                '<remove-project name="zircon"/></manifest>')
+    assert [p['name'] for p in projects] == ['garnet']
+
+def test_use_cache_false_skips_the_cache(tmp_path):
+    repo_config = RepositoryConfig(name='nebula', path=str(tmp_path), manifest=str(tmp_path / 'manifest.xml'), tag_prefix='')
+    assert ManifestParser(repo_config, cache=ManifestCache(str(tmp_path / 'cache.json')), use_cache=False).cache is None
+
+def test_cache_drops_deleted_manifests_and_old_versions(tmp_path):
+    cache_path = tmp_path / 'cache.json'
+    cache_path.write_text('{"v1|old|repo": {"files": {}, "projects": []}}')
+    cache = ManifestCache(str(cache_path))
+    removed = tmp_path / 'removed.xml'
+    kept = tmp_path / 'kept.xml'
+    for manifest in (removed, kept):
+        manifest.write_text('<manifest><project name="a"/></manifest>')
+        repo_config = RepositoryConfig(name='nebula', path=str(tmp_path), manifest=str(manifest), tag_prefix='')
+        ManifestParser(repo_config, cache=cache).parse()
+    removed.unlink()
+    repo_config = RepositoryConfig(name='nebula', path=str(tmp_path), manifest=str(kept), tag_prefix='')
+    projects = ManifestParser(repo_config, cache=ManifestCache(str(cache_path))).parse()
+    assert [p['name'] for p in projects] == ['a']
+    kept.write_text('<manifest><project name="b"/></manifest>')
+    ManifestParser(repo_config, cache=cache).parse()
+    assert [key.split('|')[1] for key in json.loads(cache_path.read_text())] == [str(kept)]
@@ -0,0 +1,57 @@
+import os
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from core.git_handler import GitHandler
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+def _git(repo, *args, date=None):
+    env = dict(os.environ, GIT_AUTHOR_NAME='a', GIT_AUTHOR_EMAIL='a@b', GIT_COMMITTER_NAME='a', GIT_COMMITTER_EMAIL='a@b')
+    if date is not None:
+        env['GIT_AUTHOR_DATE'] = env['GIT_COMMITTER_DATE'] = f'{date} +0000'
+    return subprocess.run(['git', *args], cwd=repo, check=True, stdout=subprocess.PIPE, text=True, env=env).stdout
+
+def _merge_graph(repo, seed, skew):
+    """Random branches and merges; most commits share a timestamp, and `skew` dates some parents after their children."""
+    rnd = random.Random(seed)
+    _git(repo, 'init', '-q')
+    date = 1700000000
+    _git(repo, 'commit', '-q', '--allow-empty', '-m', 'root', date=date)
+    branches = ['master']
+    tags = []
+    for index in range(40):
+        date += rnd.choice([0, 0, 0, 1])
+        commit_date = date + (rnd.choice([-300, 0, 0, 200]) if skew else 0)
+        if rnd.random() < 0.15 and len(branches) < 4:
+            branches.append(f'b{index}')
+            _git(repo, 'branch', branches[-1], rnd.choice(branches[:-1]))
+            continue
+        branch = rnd.choice(branches)
+        _git(repo, 'checkout', '-q', branch)
+        if rnd.random() < 0.35 and len(branches) > 1:
+            other = rnd.choice([name for name in branches if name != branch])
+            _git(repo, 'merge', '-q', '--no-ff', '-m', f'merge {other}', other, date=commit_date)
+        else:
+            _git(repo, 'commit', '-q', '--allow-empty', '-m', f'c{index}', date=commit_date)
+        if rnd.random() < 0.25:
+            tags.append(f'v{len(tags)}')
+            _git(repo, 'tag', tags[-1])
+    _git(repo, 'gc', '-q')
+    return tags
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('skew', [False, True])
+def test_objects_backend_matches_git_log(tmp_path, seed, skew):
+    tags = _merge_graph(tmp_path, seed, skew)
+    handler = GitHandler(str(tmp_path), log_backend='objects')
+    for old_tag in tags:
+        for new_tag in tags:
+            if old_tag == new_tag:
+                continue
+            expected = _git(tmp_path, 'log', f'{old_tag}...{new_tag}', '--no-merges', '--format=%H').split()
+            commits = [log['commit_id'] for log in handler.get_commit_logs_between_tags(old_tag, new_tag)]
+            assert commits == expected, (old_tag, new_tag)
@@ -1,14 +1,34 @@
-from typing import Callable, Dict, List
+from typing import Any, Callable, Dict, List
+import threading
+
+# progress(event_name, fields) — how pipeline stages report what they are doing
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
 
 class EventBus:
     def __init__(self) -> None:
         self.listeners: Dict[str, List[Callable]] = {}
+        self.lock = threading.Lock()
 
     def subscribe(self, event_type: str, listener: Callable) -> None:
-        if event_type not in self.listeners:
-            self.listeners[event_type] = []
-        self.listeners[event_type].append(listener)
+        with self.lock:
+            if event_type not in self.listeners:
+                self.listeners[event_type] = []
+            self.listeners[event_type].append(listener)
+
+    def unsubscribe(self, event_type: str, listener: Callable) -> None:
+        with self.lock:
+            if listener in self.listeners.get(event_type, []):
+                self.listeners[event_type].remove(listener)
 
     def publish(self, event_type: str, data) -> None:
-        for listener in self.listeners.get(event_type, []):
-            listener(data)
\ No newline at end of file
+        # Listeners run in the publishing thread; copy so they may (un)subscribe meanwhile
+        with self.lock:
+            listeners = list(self.listeners.get(event_type, []))
+        for listener in listeners:
+            listener(data)
+
+    def progress_callback(self, **context: Any) -> ProgressCallback:
+        """A ProgressCallback publishing {'event': name, **context, **fields} on the 'progress' channel."""
+        def report(event: str, fields: Dict[str, Any]) -> None:
+            self.publish('progress', {'event': event, **context, **fields})
+        return report
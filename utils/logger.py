@@ -1,13 +1,66 @@
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from config.settings import settings
 
+_log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, bytes, type(None))
+
+def _immutable(value: object) -> bool:
+    if isinstance(value, tuple):
+        return all(_immutable(item) for item in value)
+    return isinstance(value, _IMMUTABLE_ARG_TYPES)
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hands records to the writer thread unformatted, so `%` arguments are only rendered off the calling thread.
+
+    Records with mutable arguments (lists, dicts, objects) are rendered here instead,
+    since the caller may change them before the writer thread gets to them.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (_immutable(args) or (isinstance(args, dict) and all(_immutable(v) for v in args.values()))):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+def _start_listener() -> None:
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        handler = logging.FileHandler(settings.log_file)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        _listener = QueueListener(_log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+def stop_logging() -> None:
+    """Drain queued records to the log file and stop the writer thread."""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
-        # Use configurable log level and log file path
+        # Use configurable log level and log file path; the file is written by a background thread
         logger.setLevel(getattr(logging, settings.log_level.upper()))
-        handler = logging.FileHandler(settings.log_file)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        _start_listener()
+        logger.addHandler(_DeferredQueueHandler(_log_queue))
     return logger
+
+def verbose_console() -> bool:
+    # 'summary' prints per-repository totals instead of every commit
+    return settings.console_mode != 'summary'
@@ -0,0 +1,65 @@
+# utils/metrics.py
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class MetricsRegistry:
+    """Process-wide counters and gauges rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _series(self, name: str, metric_type: str, help_text: str) -> Dict[LabelKey, Any]:
+        metric = self.metrics.setdefault(name, {'type': metric_type, 'help': help_text, 'values': {}})
+        return metric['values']
+
+    def inc(self, name: str, value: float = 1, help_text: str = '', **labels: str) -> None:
+        with self.lock:
+            series = self._series(name, 'counter', help_text)
+            key = tuple(sorted(labels.items()))
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, help_text: str = '', metric_type: str = 'gauge', **labels: str) -> None:
+        with self.lock:
+            self._series(name, metric_type, help_text)[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, help_text: str = '', **labels: str) -> None:
+        # Summary without quantiles: rendered as <name>_sum and <name>_count
+        with self.lock:
+            series = self._series(name, 'summary', help_text)
+            key = tuple(sorted(labels.items()))
+            total, count = series.get(key, (0.0, 0))
+            series[key] = (total + value, count + 1)
+
+    @staticmethod
+    def _format_labels(key: LabelKey) -> str:
+        if not key:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+        return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(key, escaped)) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for name in sorted(self.metrics):
+                metric = self.metrics[name]
+                if metric['help']:
+                    lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in sorted(metric['values'].items()):
+                    labels = self._format_labels(key)
+                    if metric['type'] == 'summary':
+                        lines.append(f"{name}_sum{labels} {self._format_value(value[0])}")
+                        lines.append(f"{name}_count{labels} {value[1]}")
+                    else:
+                        lines.append(f"{name}{labels} {self._format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()